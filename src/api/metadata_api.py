@@ -3,12 +3,14 @@ Metadata API endpoints for querying and managing file metadata.
 """
 from fastapi import APIRouter, Body, HTTPException, Depends, Query
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, timedelta
 import pathlib
 import os
 import logging
+import sqlite3
 from src.db import db
 from src.utils import watcher
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -756,16 +758,14 @@ async def database_query(request: DatabaseQueryRequest = Body(...)):
             detail="Only SELECT queries are allowed for security reasons"
         )
         
-    # Check for dangerous keywords that might bypass our security
-    dangerous_keywords = ["insert", "update", "delete", "drop", "alter", "create", 
-                          "pragma", "attach", "detach", "vacuum", ";"]
-    
-    for keyword in dangerous_keywords:
-        if keyword.lower() in query.lower():
-            raise HTTPException(
-                status_code=403,
-                detail=f"Query contains disallowed keyword: {keyword}"
-            )
+    # Check for dangerous keywords that might bypass our security. Whole words
+    # only, so columns like created_time don't trip the check
+    match = db.DISALLOWED_QUERY_KEYWORDS.search(query)
+    if match:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Query contains disallowed keyword: {match.group(0).lower()}"
+        )
     
     # Add LIMIT clause if not present
     if "limit " not in query.lower():
@@ -774,15 +774,13 @@ async def database_query(request: DatabaseQueryRequest = Body(...)):
         query = f"{query} LIMIT {request.limit}"
     else:
         # If LIMIT is already present, ensure it doesn't exceed our max
-        import re
-        limit_pattern = re.compile(r'limit\s+(\d+)', re.IGNORECASE)
-        match = limit_pattern.search(query)
+        match = db.QUERY_LIMIT_PATTERN.search(query)
         if match:
             try:
                 limit_value = int(match.group(1))
                 if limit_value > request.limit:
                     # Replace with our limit
-                    query = limit_pattern.sub(f"LIMIT {request.limit}", query)
+                    query = db.QUERY_LIMIT_PATTERN.sub(f"LIMIT {request.limit}", query)
             except ValueError:
                 pass
     
@@ -790,43 +788,19 @@ async def database_query(request: DatabaseQueryRequest = Body(...)):
         import time
         start_time = time.time()
         
-        # Use SQLite's built-in connection for simplicity
-        import sqlite3
-        import json
-        
-        # Get the database path from our module
-        db_path = db.DB_PATH
-        
-        # Connect to the database directly
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # This allows us to access columns by name
-        
-        # Execute the query
-        cursor = conn.cursor()
-        if request.params:
-            cursor.execute(query, request.params)
-        else:
-            cursor.execute(query)
-        
-        # Get the results
-        rows = []
-        for row in cursor.fetchall():
-            # Convert sqlite3.Row to dict
-            row_dict = {key: row[key] for key in row.keys()}
-            rows.append(row_dict)
-        
-        # Close the connection
-        conn.close()
+        # Execute the query on a pooled read-only connection, off the event loop
+        rows = await db.run_read_only_query(query, request.params)
         
         execution_time = time.time() - start_time
         
-        return {
+        # BLOB values come back as hex strings
+        return jsonable_encoder({
             "status": "success",
             "rows": rows,
             "row_count": len(rows),
             "execution_time_ms": int(execution_time * 1000),
             "query": query
-        }
+        }, custom_encoder={bytes: db.encode_query_value})
     except sqlite3.Error as e:
         raise HTTPException(
             status_code=500,
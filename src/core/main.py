@@ -1,19 +1,22 @@
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
 from contextlib import asynccontextmanager
 
 from pydantic import BaseModel, Field
 import os
+import stat
 import pathlib
 import asyncio
-import aiofiles
-from typing import List, Optional, Literal, Union, Dict, Any
+from typing import List, Optional, Literal, Union, Dict, Any, Tuple
 import difflib
 import shutil
+import tempfile
 from datetime import datetime, timezone
 import functools
 import threading
+import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
@@ -21,12 +24,42 @@ from starlette.responses import Response
 import time
 from datetime import timedelta
 import re
+import fnmatch
+import itertools
 import logging
+import bisect
+from collections import deque
+import mmap
+import hashlib
+import sqlite3
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prefer an io_uring-backed drop-in replacement for aiofiles when installed
+# (Linux only); it keeps the aiofiles API so no call sites change
+try:
+    import ayafileio as aiofiles
+    AIOFILES_BACKEND = "ayafileio"
+except ImportError:
+    import aiofiles
+    AIOFILES_BACKEND = "aiofiles"
+
+# Serialize large JSON payloads with orjson when installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Open file limits can only be raised on Unix
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
 # Import database and watcher modules properly
 try:
     from src.db import db
@@ -58,32 +91,127 @@ ALLOWED_DIRECTORIES = [
 ]  # 👈 Replace with your paths
 
 # Pre-compute resolved allowed paths
-ALLOWED_PATHS = [pathlib.Path(path).resolve() for path in ALLOWED_DIRECTORIES]
-
-# Configure thread pool for CPU-bound operations with proper cleanup
-# Use a more conservative number of workers to prevent system overload
-THREAD_POOL = ThreadPoolExecutor(max_workers=10)
+ALLOWED_PATHS = tuple(pathlib.Path(path).resolve() for path in ALLOWED_DIRECTORIES)
+
+# String forms of the allowed paths for exception-free containment checks:
+# a path is allowed if it equals one of ALLOWED_PATH_STRS or starts with
+# one of ALLOWED_PREFIX_TUPLE (the same paths with a trailing separator)
+ALLOWED_PATH_STRS = frozenset(str(path) for path in ALLOWED_PATHS)
+ALLOWED_PREFIX_TUPLE = tuple(sorted(
+    path if path.endswith(os.sep) else path + os.sep
+    for path in ALLOWED_PATH_STRS
+))
+
+# Configure thread pool for blocking file operations with proper cleanup
+# Sized from the CPU count by default; override with the THREAD_POOL_SIZE env var
+from src.utils.config import THREAD_POOL_SIZE, SEARCH_THREAD_POOL_SIZE, MAX_CONCURRENT_SEARCHES, RESPONSE_CACHE_ENABLED
+THREAD_POOL = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+
+# Separate pool for content search so a large scan can't occupy every worker
+# of THREAD_POOL; override with the SEARCH_THREAD_POOL_SIZE env var
+SEARCH_THREAD_POOL = ThreadPoolExecutor(max_workers=SEARCH_THREAD_POOL_SIZE, thread_name_prefix="search")
+
+# Bounds the search_files walks running at once; each one occupies a THREAD_POOL
+# worker until it finishes, so a burst of searches queues here rather than
+# starving every other endpoint of threads. Override with MAX_CONCURRENT_SEARCHES
+search_slots = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+# Directories search_files lists at once in SEARCH_THREAD_POOL when it walks
+# the filesystem; concurrent listings hide stat latency on network mounts
+SEARCH_WALK_CONCURRENCY = 32
 
 # File content cache with 100 MB max size, per file limit 10 MB
 FILE_CACHE_MAX_ENTRIES = 100
 FILE_CACHE_MAX_SIZE = 100 * 1024 * 1024  # 100 MB
 FILE_CACHE_ENTRY_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
+# Keyed by the resolved path string: str objects cache their hash, and the
+# real path is needed for the ordered prefix invalidation below
 file_cache: Dict[str, Dict[str, Any]] = {}
 file_cache_size = 0
+# Sorted copy of the cache keys so directory-prefix invalidation is a bisect range
+file_cache_keys: List[str] = []
+
+# Streaming reads use positional os.pread() on a raw fd where the platform has it
+PREAD_AVAILABLE = hasattr(os, "pread")
+
+# Large binary streams bypass the page cache with O_DIRECT, reading into
+# page-aligned buffers (chunk sizes are rounded up to the alignment)
+DIRECT_IO_AVAILABLE = PREAD_AVAILABLE and hasattr(os, "O_DIRECT") and hasattr(os, "preadv")
+DIRECT_IO_MIN_SIZE = 16 * 1024 * 1024  # 16 MB
+DIRECT_IO_ALIGNMENT = 4096
+
+# Number of chunk reads kept in flight ahead of the consumer when streaming
+STREAM_READ_AHEAD = 8
+
+# Large streams that can't use O_DIRECT get sequential/readahead hints instead
+FADVISE_AVAILABLE = hasattr(os, "posix_fadvise")
+
+# Directory trees at most this deep are built inline on the event loop; for
+# shallow preview walks the thread pool dispatch costs more than the walk
+INLINE_TREE_MAX_DEPTH = 2
+
+# Non-streaming reads below this size are done inline on the event loop; the
+# read is cheaper than a thread pool dispatch for small, page-cached files
+INLINE_READ_MAX_SIZE = 64 * 1024  # 64 KB
 
 # Thread lock for cache operations to ensure thread safety
-cache_lock = threading.RLock()
+# Only writers (add/evict/invalidate/cleanup) take it; cache hits read the dict lock-free
+cache_lock = threading.Lock()
 
 # Last cache cleanup time
 last_cache_cleanup = datetime.now().timestamp()
 CACHE_CLEANUP_INTERVAL = 300  # seconds (5 minutes)
 
+# Content search reads files up to this size whole and scans the raw bytes
+# with a compiled pattern; larger files are read and scanned in chunks
+SEARCH_READ_WHOLE_MAX_SIZE = 4 * 1024 * 1024  # 4 MB
+SEARCH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# search_files_with_hash reads files in blocks of this size when
+# hashlib.file_digest (Python 3.11+) isn't available
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# File extensions treated as binary by content search (skipped without opening)
+BINARY_EXTS = frozenset({
+    '.exe', '.dll', '.bin', '.zip', '.tar', '.gz',
+    '.jpg', '.jpeg', '.png', '.gif', '.mp3', '.mp4'
+})
+
+# Content type sent for streamed files by extension; anything else is binary
+STREAM_CONTENT_TYPES = dict.fromkeys(
+    ('.txt', '.md', '.py', '.js', '.css', '.html', '.json', '.xml'),
+    "text/plain; charset=utf-8"
+)
+
+# Simple mime type inference by extension for directory listings
+EXTENSION_MIME_TYPES = {
+    '.txt': 'text/plain',
+    '.html': 'text/html',
+    '.htm': 'text/html',
+    '.css': 'text/css',
+    '.js': 'application/javascript',
+    '.json': 'application/json',
+    '.xml': 'application/xml',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.pdf': 'application/pdf',
+    '.zip': 'application/zip',
+    '.md': 'text/markdown',
+    '.py': 'text/x-python',
+    '.csv': 'text/csv'
+}
+
 # Try to import psutil at module level
 try:
     import psutil
     PSUTIL_AVAILABLE = True
+    # Resolve the process handle once instead of on every request
+    _PROC = psutil.Process()
 except ImportError:
     PSUTIL_AVAILABLE = False
+    _PROC = None
 
 # Define lifespan context manager
 @asynccontextmanager
@@ -94,9 +222,29 @@ async def lifespan(app: FastAPI):
     """
     # === Startup operations ===
     print(f"Starting Secure Filesystem API (v0.1.0)")
+    
+    # Make the bounded THREAD_POOL the loop's default executor so aiofiles and
+    # any run_in_executor(None, ...) calls share it instead of a second pool
+    asyncio.get_running_loop().set_default_executor(THREAD_POOL)
     print(f"Allowed directories: {ALLOWED_DIRECTORIES}")
     print(f"Cache size: {FILE_CACHE_MAX_SIZE / (1024*1024):.1f} MB")
     print(f"Thread pool workers: {THREAD_POOL._max_workers}")
+    print(f"Search thread pool workers: {SEARCH_THREAD_POOL._max_workers}")
+    print(f"Concurrent searches: {MAX_CONCURRENT_SEARCHES}")
+    
+    # Concurrent walks and scans hold many directories and files open at once,
+    # so raise the soft open-file limit to the hard limit where the platform allows
+    if RESOURCE_AVAILABLE:
+        try:
+            soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+            if hard == resource.RLIM_INFINITY:
+                hard = max(soft, 65536)
+            if soft != resource.RLIM_INFINITY and soft < hard:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+                print(f"Open file limit raised from {soft} to {hard}")
+        except (ValueError, OSError) as e:
+            print(f"WARNING: Could not raise the open file limit: {e}")
+    print(f"Async file backend: {AIOFILES_BACKEND}")
     
     # Verify allowed directories exist and are accessible
     for directory in ALLOWED_DIRECTORIES:
@@ -137,16 +285,33 @@ async def lifespan(app: FastAPI):
             print("Initializing file watcher system...")
             # Initialize watcher with empty list (no directories watched by default)
             await watcher.initialize_watcher([])
+            # Cached listings under a rescanned directory may predate changes it found
+            if invalidate_search_cache not in watcher.change_listeners:
+                watcher.change_listeners.append(invalidate_search_cache)
             print("File watcher system initialized - no directories being watched by default")
         except Exception as e:
             print(f"WARNING: Failed to initialize file watcher: {e}")
     
+    # Sweep the file cache in the background instead of inside request handlers
+    cache_cleanup_task = asyncio.create_task(_cache_cleanup_loop())
+    
     # Start the application
     print("Application ready")
     yield
     
     # === Shutdown operations ===
     try:
+        # Stop the background cache sweep
+        cache_cleanup_task.cancel()
+        try:
+            await cache_cleanup_task
+        except asyncio.CancelledError:
+            pass
+        
+        # Let pending metadata updates finish before the database closes
+        if background_tasks:
+            await asyncio.gather(*background_tasks, return_exceptions=True)
+        
         # Stop the file watcher if it was started
         if WATCHER_AVAILABLE:
             try:
@@ -167,22 +332,26 @@ async def lifespan(app: FastAPI):
         # Clear the cache
         with cache_lock:
             file_cache.clear()
+            file_cache_keys.clear()
         
-        # Shutdown the thread pool
-        try:
-            THREAD_POOL.shutdown(wait=True, cancel_futures=True)
-        except (AttributeError, TypeError):
-            # Fallback for older Python versions without cancel_futures
-            THREAD_POOL.shutdown(wait=True)
+        # Shutdown the thread pools
+        for pool in (SEARCH_THREAD_POOL, THREAD_POOL):
+            try:
+                pool.shutdown(wait=True, cancel_futures=True)
+            except (AttributeError, TypeError):
+                # Fallback for older Python versions without cancel_futures
+                pool.shutdown(wait=True)
             
         # Clear the path cache
-        normalize_path.cache_clear()
+        with normalized_path_lock:
+            normalized_path_cache.clear()
         
         print("Application shutdown complete")
     except Exception as e:
         print(f"Error during shutdown: {e}")
-        # Even if we have an error, try to shutdown the thread pool
+        # Even if we have an error, try to shutdown the thread pools
         try:
+            SEARCH_THREAD_POOL.shutdown(wait=False)
             THREAD_POOL.shutdown(wait=False)
         except:
             pass
@@ -234,20 +403,39 @@ app = FastAPI(
 # Enhance the OpenAPI schema with natural language mappings
 enhance_openapi_schema(app)
 
+def is_allowed_path(path_str: str) -> bool:
+    """
+    Check whether an already-resolved path string is inside an allowed directory.
+    Uses a single C-level startswith over all prefixes instead of relative_to() in try/except;
+    this is also much cheaper than walking the parent chain with a set lookup per level.
+    """
+    return path_str.startswith(ALLOWED_PREFIX_TUPLE) or path_str in ALLOWED_PATH_STRS
+
+# Cache of requested path -> resolved path for normalize_path. A plain dict rather
+# than lru_cache so moves and deletes can drop just the entries they affect;
+# lookups are lock-free, inserts and invalidation take the lock
+NORMALIZED_PATH_CACHE_MAX_ENTRIES = 1024
+normalized_path_cache: Dict[str, pathlib.Path] = {}
+normalized_path_lock = threading.Lock()
+
 # Required implementation of normalize_path function (moved up from below)
-@functools.lru_cache(maxsize=1024)
 def normalize_path(requested_path: str) -> pathlib.Path:
     """
     Resolves the requested path and verifies it is within one of the allowed directories.
     This function is cached for better performance on repeated access.
     """
+    cached = normalized_path_cache.get(requested_path)
+    if cached is not None:
+        return cached
+        
     requested = pathlib.Path(os.path.expanduser(requested_path)).resolve()
-    for allowed_path in ALLOWED_PATHS:
-        try:
-            requested.relative_to(allowed_path)
-            return requested
-        except ValueError:
-            continue
+    if is_allowed_path(str(requested)):
+        with normalized_path_lock:
+            if len(normalized_path_cache) >= NORMALIZED_PATH_CACHE_MAX_ENTRIES:
+                # Evict the oldest entry (dicts keep insertion order)
+                del normalized_path_cache[next(iter(normalized_path_cache))]
+            normalized_path_cache[requested_path] = requested
+        return requested
     raise HTTPException(
         status_code=403,
         detail={
@@ -258,6 +446,22 @@ def normalize_path(requested_path: str) -> pathlib.Path:
         },
     )
 
+def invalidate_normalized_paths(path_str: str):
+    """
+    Drop cached normalize_path results whose requested or resolved path is
+    path_str or lies under it, e.g. after it was moved or deleted and symlinks
+    through it may now resolve differently.
+    """
+    prefix = path_str if path_str.endswith(os.sep) else path_str + os.sep
+    with normalized_path_lock:
+        stale = [
+            requested for requested, resolved in normalized_path_cache.items()
+            if requested == path_str or requested.startswith(prefix)
+            or str(resolved) == path_str or str(resolved).startswith(prefix)
+        ]
+        for requested in stale:
+            del normalized_path_cache[requested]
+
 # Include the metadata API router if available
 if METADATA_API_ROUTER_AVAILABLE:
     # Make the normalize_path function available to the router
@@ -276,20 +480,16 @@ if METADATA_API_ROUTER_AVAILABLE:
 
 def cleanup_cache() -> None:
     """
-    Periodically clean up the cache:
+    Clean up the cache:
     1. Remove stale entries
     2. Check if cached files still exist
     3. Enforce size limits
+    Runs every CACHE_CLEANUP_INTERVAL seconds from _cache_cleanup_loop.
     """
     global file_cache, file_cache_size, last_cache_cleanup
     
     with cache_lock:
         current_time = datetime.now().timestamp()
-        
-        # Only run cleanup occasionally to avoid excessive disk I/O
-        if current_time - last_cache_cleanup < CACHE_CLEANUP_INTERVAL:
-            return
-        
         last_cache_cleanup = current_time
         paths_to_remove = []
         
@@ -318,9 +518,149 @@ def cleanup_cache() -> None:
         
         # Remove invalid entries
         for path in paths_to_remove:
-            content_size = file_cache[path]['size']
-            del file_cache[path]
-            file_cache_size -= content_size
+            _remove_cache_entry(path)
+
+async def _cache_cleanup_loop() -> None:
+    """
+    Background task that sweeps the file cache every CACHE_CLEANUP_INTERVAL seconds.
+    The sweep stats every cached file, so it runs in the thread pool.
+    """
+    while True:
+        await asyncio.sleep(CACHE_CLEANUP_INTERVAL)
+        try:
+            await run_in_threadpool(cleanup_cache)
+        except Exception as e:
+            logger.warning(f"Cache cleanup failed: {e}")
+
+# Recent search_content results keyed on (base path, file pattern, recursive, query).
+# Each entry keeps the mtimes of every directory walked and file searched, taken
+# before the files were read, and is only served while all of them still match:
+# edits change a file's mtime and added, removed or renamed files change their
+# directory's, wherever in the tree they happen. Entries are also dropped when a
+# change goes through invalidate_cache_for_path, and expire after SEARCH_CACHE_TTL.
+# Only touched from the event loop, so it needs no lock
+SEARCH_CACHE_MAX_ENTRIES = 256
+SEARCH_CACHE_TTL = 30  # seconds
+search_cache: Dict[tuple, Dict[str, Any]] = {}
+
+async def get_cached_search(key: tuple, target: int) -> Optional[Dict[str, Any]]:
+    """
+    Return a cached search entry if still valid and complete enough to serve
+    a page ending at target (searches that stopped early only cover their own page).
+    """
+    entry = search_cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry['cached_at'] > SEARCH_CACHE_TTL:
+        del search_cache[key]
+        return None
+    if entry['target'] is not None and entry['target'] < target:
+        return None
+    mtimes = await asyncio.get_running_loop().run_in_executor(
+        SEARCH_THREAD_POOL, path_mtimes, list(entry['mtimes'])
+    )
+    if mtimes != entry['mtimes']:
+        search_cache.pop(key, None)
+        return None
+    return entry
+
+def add_cached_search(key: tuple, mtimes: Dict[str, Optional[int]], target: Optional[int],
+                      results: List[Dict[str, Any]], errors: List[Dict[str, str]],
+                      stats: Dict[str, Any]) -> None:
+    """
+    Cache a search_content result; mtimes are those of the walked directories and
+    searched files, and target is None when the search wasn't cut short.
+    """
+    search_cache.pop(key, None)
+    if len(search_cache) >= SEARCH_CACHE_MAX_ENTRIES:
+        # Evict the oldest entry (dicts keep insertion order)
+        del search_cache[next(iter(search_cache))]
+    search_cache[key] = {
+        'cached_at': time.monotonic(),
+        'mtimes': mtimes,
+        'target': target,
+        'results': results,
+        'errors': errors,
+        'stats': stats,
+    }
+
+# Recent list_directory and search_files responses keyed on (base path, endpoint,
+# request body), for clients that replay identical requests; only used when
+# RESPONSE_CACHE_ENABLED. Entries are checked against the base directory's mtime,
+# dropped when a change goes through invalidate_cache_for_path or the watcher
+# picks one up, and expire after RESPONSE_CACHE_TTL, since edits and anything
+# below the base directory don't change its mtime
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL = 5  # seconds
+response_cache: Dict[tuple, Dict[str, Any]] = {}
+
+def get_cached_response(key: tuple, base_mtime_ns: int) -> Optional[BaseModel]:
+    """Return a cached response for key, or None if missing, stale or caching is off."""
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+    if (time.monotonic() - entry['cached_at'] > RESPONSE_CACHE_TTL
+            or entry['base_mtime_ns'] != base_mtime_ns):
+        del response_cache[key]
+        return None
+    return entry['response']
+
+def add_cached_response(key: tuple, base_mtime_ns: int, response: BaseModel) -> None:
+    """Cache a list_directory or search_files response (if caching is on)."""
+    if not RESPONSE_CACHE_ENABLED:
+        return
+    response_cache.pop(key, None)
+    if len(response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+        # Evict the oldest entry (dicts keep insertion order)
+        del response_cache[next(iter(response_cache))]
+    response_cache[key] = {
+        'cached_at': time.monotonic(),
+        'base_mtime_ns': base_mtime_ns,
+        'response': response,
+    }
+
+def invalidate_search_cache(path: str) -> None:
+    """Drop cached searches and listings whose base directory contains path or lies under it."""
+    for cache in (search_cache, response_cache):
+        stale = [
+            key for key in cache
+            if path == key[0] or path.startswith(key[0] + os.sep) or key[0].startswith(path + os.sep)
+        ]
+        for key in stale:
+            del cache[key]
+
+# Strong references to fire-and-forget tasks; the event loop only keeps weak ones
+background_tasks: set = set()
+
+def run_in_background(coro, description: str) -> None:
+    """
+    Schedule a side-effect coroutine (e.g. a metadata update) without awaiting it,
+    so the response doesn't wait on it. Failures are logged, never raised.
+    """
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    
+    def _done(task):
+        background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to {description}: {task.exception()}")
+            
+    task.add_done_callback(_done)
+
+def _remove_cache_entry(path: str) -> None:
+    """
+    Remove a single entry from the cache and its sorted key index.
+    Caller must hold cache_lock.
+    """
+    global file_cache_size
+    
+    entry = file_cache.pop(path)
+    file_cache_size -= entry['size']
+    index = bisect.bisect_left(file_cache_keys, path)
+    if index < len(file_cache_keys) and file_cache_keys[index] == path:
+        del file_cache_keys[index]
 
 def add_to_file_cache(path: str, content: str, modified_time: float) -> bool:
     """
@@ -337,8 +677,9 @@ def add_to_file_cache(path: str, content: str, modified_time: float) -> bool:
         return False
     
     with cache_lock:
-        # Periodically clean up the cache
-        cleanup_cache()
+        # Replace any existing entry so its size isn't counted twice
+        if path in file_cache:
+            _remove_cache_entry(path)
         
         # If cache is full, remove least recently used entries
         while (len(file_cache) >= FILE_CACHE_MAX_ENTRIES or 
@@ -349,9 +690,7 @@ def add_to_file_cache(path: str, content: str, modified_time: float) -> bool:
                 file_cache.items(), 
                 key=lambda x: (datetime.now().timestamp() - x[1]['last_access']) * (1 / (x[1].get('access_count', 1)))
             )[0]
-            removed_size = file_cache[oldest_path]['size']
-            del file_cache[oldest_path]
-            file_cache_size -= removed_size
+            _remove_cache_entry(oldest_path)
         
         # Add to cache
         file_cache[path] = {
@@ -361,6 +700,7 @@ def add_to_file_cache(path: str, content: str, modified_time: float) -> bool:
             'size': content_size,
             'access_count': 1
         }
+        bisect.insort(file_cache_keys, path)
         file_cache_size += content_size
         return True
 
@@ -368,50 +708,56 @@ def get_from_file_cache(path: str, modified_time: float) -> Optional[str]:
     """
     Get file content from cache if available and not modified.
     Returns None if not in cache or if cached version is stale.
-    Thread-safe with lock protection.
+    Cache hits are lock-free (dict reads are atomic under the GIL);
+    the lock is only taken to evict a stale entry.
     """
-    global file_cache, file_cache_size
+    entry = file_cache.get(path)
+    if entry is None:
+        return None
+        
+    # Check if file has been modified since cached
+    if entry['modified_time'] >= modified_time:
+        # Update access time and increment access count (races only skew LRU stats)
+        entry['last_access'] = datetime.now().timestamp()
+        entry['access_count'] = entry.get('access_count', 1) + 1
+        return entry['content']
     
+    # Remove stale entry, unless another thread already replaced it
     with cache_lock:
-        if path in file_cache:
-            # Check if file has been modified since cached
-            if file_cache[path]['modified_time'] >= modified_time:
-                # Update access time and increment access count
-                file_cache[path]['last_access'] = datetime.now().timestamp()
-                file_cache[path]['access_count'] = file_cache[path].get('access_count', 1) + 1
-                return file_cache[path]['content']
-            
-            # Remove stale entry
-            content_size = file_cache[path]['size']
-            del file_cache[path]
-            file_cache_size -= content_size
-        
-        return None
+        if file_cache.get(path) is entry:
+            _remove_cache_entry(path)
+    
+    return None
 
 def invalidate_cache_for_path(path: str) -> None:
     """
     Remove a specific path from the cache after modification.
     Also invalidates parent directory paths for moved/renamed files.
-    Thread-safe with lock protection.
+    Thread-safe with lock protection. Costs O(log n + k) for k removed entries
+    via the sorted key index, and keeps reads to a single dict lookup.
     """
     global file_cache, file_cache_size
     
     with cache_lock:
         # Exact path match
         if path in file_cache:
-            content_size = file_cache[path]['size']
-            del file_cache[path]
-            file_cache_size -= content_size
+            _remove_cache_entry(path)
             
         # Also check for moved files by removing paths that start with the directory path
-        # This is for when a directory is moved or renamed
-        path_with_slash = f"{path}/"
-        paths_to_remove = [p for p in file_cache if p.startswith(path_with_slash)]
+        # This is for when a directory is moved or renamed.
+        # Keys under "path/" form a contiguous run in the sorted index, ending
+        # before "path0" ('0' is the character after '/').
+        start = bisect.bisect_left(file_cache_keys, f"{path}/")
+        end = bisect.bisect_left(file_cache_keys, f"{path}0", start)
+        paths_to_remove = file_cache_keys[start:end]
         
         for p in paths_to_remove:
-            content_size = file_cache[p]['size']
-            del file_cache[p]
-            file_cache_size -= content_size
+            entry = file_cache.pop(p)
+            file_cache_size -= entry['size']
+        del file_cache_keys[start:end]
+        
+    # Cached content searches over this path are stale too
+    invalidate_search_cache(path)
 
 def secure_get_file_size(file_path):
     """
@@ -429,16 +775,7 @@ def secure_get_file_size(file_path):
         file_path = pathlib.Path(file_path)
     
     # Verify path is within allowed directories
-    valid_path = False
-    for allowed_path in ALLOWED_PATHS:
-        try:
-            file_path.relative_to(allowed_path)
-            valid_path = True
-            break
-        except ValueError:
-            continue
-    
-    if not valid_path:
+    if not is_allowed_path(str(file_path)):
         raise PermissionError(f"Path {file_path} is outside allowed directories")
         
     # Check that the file exists and is a regular file (not a symlink, etc.)
@@ -452,6 +789,42 @@ def secure_get_file_size(file_path):
     stat_result = file_path.stat()
     return stat_result.st_size
 
+@functools.lru_cache(maxsize=4096)
+def format_utc_timestamp(timestamp: float) -> str:
+    """
+    Format a POSIX timestamp as an ISO 8601 UTC string.
+    Cached so repeated listings, and ctime equal to mtime, skip building a datetime.
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+def file_identities(paths: List[str]) -> Dict[str, Tuple[str, int, int]]:
+    """
+    Map each path to its (resolved path, size, mtime_ns), following symlinks.
+    Paths that can't be resolved or stat'ed are left out.
+    """
+    identities = {}
+    for path in paths:
+        try:
+            real_path = os.path.realpath(path)
+            st = os.stat(real_path)
+        except OSError:
+            continue
+        identities[path] = (real_path, st.st_size, st.st_mtime_ns)
+    return identities
+
+def file_sha256(path: str) -> Optional[str]:
+    """Return the SHA-256 of a file's content as a hex string, or None if it can't be read."""
+    try:
+        with open(path, "rb", buffering=0) as f:
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            digest = hashlib.sha256()
+            for chunk in iter(functools.partial(f.read, HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            return digest.hexdigest()
+    except OSError:
+        return None
+
 # Helper function to run tasks in the thread pool
 async def run_in_threadpool(func, *args, **kwargs):
     """
@@ -459,10 +832,10 @@ async def run_in_threadpool(func, *args, **kwargs):
     This centralizes thread pool usage for better resource management.
     """
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        THREAD_POOL, 
-        lambda: func(*args, **kwargs)
-    )
+    # Positional args are passed straight through; only bind kwargs when present
+    if kwargs:
+        func = functools.partial(func, **kwargs)
+    return await loop.run_in_executor(THREAD_POOL, func, *args)
 
 # Configure CORS middleware for cross-origin requests
 # This is crucial for allowing web UIs to access our API
@@ -509,8 +882,12 @@ async def add_performance_headers(request, call_next):
     start_time = datetime.now()
     memory_before = 0
     
-    if PSUTIL_AVAILABLE:
-        memory_before = psutil.Process().memory_info().rss
+    # Memory tracking reads /proc on every call, so it is opt-in per request
+    # via the "X-Debug-Mem: 1" header
+    track_memory = PSUTIL_AVAILABLE and request.headers.get("X-Debug-Mem") == "1"
+    
+    if track_memory:
+        memory_before = _PROC.memory_info().rss
         
     response = await call_next(request)
     process_time = (datetime.now() - start_time).total_seconds()
@@ -518,9 +895,9 @@ async def add_performance_headers(request, call_next):
     # Add processing time to response headers
     response.headers["X-Process-Time"] = str(process_time)
     
-    # Track memory usage if psutil is available
-    if PSUTIL_AVAILABLE:
-        memory_after = psutil.Process().memory_info().rss
+    # Track memory usage if requested and psutil is available
+    if track_memory:
+        memory_after = _PROC.memory_info().rss
         memory_diff = memory_after - memory_before
         memory_mb = memory_diff / (1024 * 1024)
         
@@ -680,7 +1057,187 @@ class MetadataSearchRequest(BaseModel):
 # File Operations
 # ------------------------------------------------------------------------------
 
-def search_file_content(file_path, search_query_lower, max_results=1000):
+# search_content reports at most this many errors; later ones are only counted
+SEARCH_MAX_REPORTED_ERRORS = 100
+
+def _push_error(errors: List[Dict[str, str]], error: Dict[str, str]) -> None:
+    """Record a search error unless SEARCH_MAX_REPORTED_ERRORS have been kept already."""
+    if len(errors) < SEARCH_MAX_REPORTED_ERRORS:
+        errors.append(error)
+
+def _is_path_pattern(pattern: str) -> bool:
+    """Whether a glob pattern contains a path separator (and so needs pathlib globbing)."""
+    return os.sep in pattern or bool(os.altsep and os.altsep in pattern)
+
+def _iter_files(base_path: pathlib.Path, pattern: str, recursive: bool,
+                walked_dirs: Optional[List[str]] = None):
+    """
+    Lazily yield paths (as strings) of files under base_path whose name matches
+    the glob pattern, using os.scandir so DirEntry type info avoids a stat per entry.
+    Directories are walked with an explicit stack and symlinked directories are not
+    followed; each one listed is appended to walked_dirs if given. Patterns
+    containing a path separator fall back to pathlib globbing.
+    """
+    if _is_path_pattern(pattern):
+        matches = base_path.rglob(pattern) if recursive else base_path.glob(pattern)
+        for match in matches:
+            if match.is_file():
+                yield str(match)
+        return
+        
+    match_name = re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+    stack = [str(base_path)]
+    while stack:
+        dir_path = stack.pop()
+        if walked_dirs is not None:
+            walked_dirs.append(dir_path)
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and match_name(os.path.normcase(entry.name)):
+                        yield entry.path
+        except OSError:
+            # Unreadable or vanished directory; skip it like glob does
+            continue
+
+@functools.lru_cache(maxsize=512)
+def compile_glob_union(patterns: Tuple[str, ...]):
+    """
+    Compile glob patterns into the match method of one regex that matches
+    wherever fnmatch.fnmatch would match any of them, or None for no patterns.
+    Cached, since clients tend to repeat the same filters; pass a sorted tuple.
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(os.path.normcase(p)) for p in patterns)).match
+
+@functools.lru_cache(maxsize=512)
+def extension_set(file_types: Tuple[str, ...]) -> frozenset:
+    """Normalize file type filters ('.py', 'PY') to a set of bare lowercase extensions. Cached."""
+    return frozenset(t.lstrip('.').lower() for t in file_types)
+
+def _collect_files(base_path: pathlib.Path, pattern: str, recursive: bool,
+                   limit: int) -> Tuple[List[str], Optional[List[str]]]:
+    """
+    Collect up to limit matching file paths from _iter_files; blocking, meant for a
+    thread pool. Also returns the directories listed along the way, or None for
+    path patterns, whose pathlib globbing doesn't report them.
+    """
+    walked_dirs = None if _is_path_pattern(pattern) else []
+    files = list(itertools.islice(_iter_files(base_path, pattern, recursive, walked_dirs), limit))
+    return files, walked_dirs
+
+def path_mtimes(paths: List[str]) -> Dict[str, Optional[int]]:
+    """mtime_ns of each path, None where it can't be stat'ed; blocking, meant for a thread pool."""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+def compile_search_query(search_query_lower: str) -> Optional["re.Pattern[bytes]"]:
+    """
+    Compile a search query into a case-insensitive bytes pattern, once per request.
+    Returns None for non-ASCII queries, whose case folding bytes patterns can't match.
+    """
+    if not search_query_lower.isascii():
+        return None
+    return re.compile(re.escape(search_query_lower.encode('ascii')), re.IGNORECASE)
+
+def _search_bytes(file_path_str: str, content: bytes, pattern: "re.Pattern[bytes]",
+                  max_results: int, results: List[Dict[str, Any]], first_line: int = 1) -> bool:
+    """
+    Find the lines of raw file content that match a compiled bytes pattern and
+    append them to results; first_line is the line number content starts at.
+    Only matching lines are decoded; line numbers are counted between matches.
+    Returns True once max_results is reached (a truncation marker is appended).
+    """
+    line_num = first_line
+    counted_to = 0
+    pos = 0
+    while True:
+        match = pattern.search(content, pos)
+        if match is None:
+            return False
+            
+        line_start = content.rfind(b'\n', 0, match.start()) + 1
+        line_end = content.find(b'\n', match.end())
+        if line_end < 0:
+            line_end = len(content)
+        line_num += content.count(b'\n', counted_to, line_start)
+        counted_to = line_start
+        
+        results.append({
+            "file_path": file_path_str,
+            "line_number": line_num,
+            "line_content": content[line_start:line_end].decode('utf-8', errors='ignore').strip(),
+        })
+        
+        # Limit results per file to avoid excessive memory usage
+        if len(results) >= max_results:
+            results.append({
+                "file_path": file_path_str,
+                "truncated": True,
+                "message": f"Results truncated at {max_results} matches"
+            })
+            return True
+            
+        # Continue after this line so each line is reported once
+        pos = line_end + 1
+
+def _search_chunks(file_path_str: str, file, pattern: "re.Pattern[bytes]",
+                   max_results: int, results: List[Dict[str, Any]]) -> None:
+    """
+    Scan an unbuffered binary file in SEARCH_CHUNK_SIZE reads, searching each
+    run of complete lines and carrying a trailing partial line into the next read.
+    """
+    first_line = 1
+    carry = b''
+    while True:
+        chunk = file.read(SEARCH_CHUNK_SIZE)
+        if chunk:
+            content = carry + chunk
+            cut = content.rfind(b'\n') + 1
+            if cut == 0:
+                # No complete line yet
+                carry = content
+                continue
+            content, carry = content[:cut], content[cut:]
+        else:
+            # End of file: whatever is left is the last line
+            content, carry = carry, b''
+            
+        if _search_bytes(file_path_str, content, pattern, max_results, results, first_line):
+            return
+        if not chunk:
+            return
+        first_line += content.count(b'\n')
+
+def has_binary_extension(file_path_str: str) -> bool:
+    """
+    Check whether a path has one of the BINARY_EXTS extensions.
+    os.path string functions avoid building a PurePath per file, and like
+    Path.suffix they ignore dots in directory names and leading dots.
+    """
+    return os.path.splitext(os.path.basename(file_path_str))[1].lower() in BINARY_EXTS
+
+class SkippedResult(list):
+    """
+    search_file_content result for a file that was skipped, holding its single
+    skip entry. The distinct type lets search_content count skips with an
+    identity check instead of inspecting the entry.
+    """
+    __slots__ = ()
+
+def _skipped_result(file_path_str: str, reason: str) -> SkippedResult:
+    """Build the skip result for a file search_file_content didn't search."""
+    return SkippedResult(({"file_path": file_path_str, "skipped": True, "reason": reason},))
+
+def search_file_content(file_path, search_query_lower, max_results=1000, search_pattern=None):
     """
     Search a single file for the given query.
     This function is run in a thread pool to parallelize IO-bound operations.
@@ -690,52 +1247,64 @@ def search_file_content(file_path, search_query_lower, max_results=1000):
         file_path: Path to the file to search
         search_query_lower: Lowercase search query to find
         max_results: Maximum number of results to return per file
+        search_pattern: Query compiled by compile_search_query, if available
     
     Returns:
         List of results with file path, line number, and content
     """
     results = []
     error = None
+    file_path_str = str(file_path)
     
     try:
+        # Check if file is likely binary based on extension, before any IO
+        if has_binary_extension(file_path_str):
+            return _skipped_result(file_path_str, "Binary file (by extension)")
+            
         # Skip very large files to avoid out-of-memory issues
         try:
             file_size = secure_get_file_size(file_path)
             if file_size > 100 * 1024 * 1024:  # Skip files larger than 100MB
-                return [{
-                    "file_path": str(file_path),
-                    "skipped": True,
-                    "reason": f"File too large ({file_size / (1024*1024):.2f} MB)"
-                }]
+                return _skipped_result(file_path_str, f"File too large ({file_size / (1024*1024):.2f} MB)")
         except Exception as e:
             return [{
                 "file_path": str(file_path),
                 "error": f"Error checking file size: {str(e)}"
             }]
             
-        # Check if file is likely binary based on extension
-        if pathlib.Path(file_path).suffix.lower() in ('.exe', '.dll', '.bin', '.zip', '.tar', '.gz', 
-                                                     '.jpg', '.jpeg', '.png', '.gif', '.mp3', '.mp4'):
-            return [{
-                "file_path": str(file_path),
-                "skipped": True,
-                "reason": "Binary file (by extension)"
-            }]
+        # With a compiled query files are scanned as raw bytes, so files without
+        # a match are never decoded: smaller files in a single read, larger ones
+        # in SEARCH_CHUNK_SIZE reads
+        if search_pattern is not None:
+            with open(file_path, "rb", buffering=0) as f:
+                if file_size <= SEARCH_READ_WHOLE_MAX_SIZE:
+                    content = f.readall()
+                else:
+                    content = f.read(SEARCH_CHUNK_SIZE)
+                    
+                # If more than 10% of the first 1024 bytes are null or control chars, likely binary
+                control_count = sum(1 for b in content[:1024] if b < 32 and b not in b'\r\n\t')
+                if control_count > 100:
+                    return _skipped_result(file_path_str, "Binary file (content check)")
+                    
+                if file_size <= SEARCH_READ_WHOLE_MAX_SIZE:
+                    _search_bytes(file_path_str, content, search_pattern, max_results, results)
+                else:
+                    f.seek(0)
+                    _search_chunks(file_path_str, f, search_pattern, max_results, results)
+            return results
         
-        # Use aiofiles-compatible opening method but in sync mode for threadpool
+        # Use aiofiles-compatible opening method but in sync mode for threadpool,
+        # with a large buffer so big files take fewer read calls
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            with open(file_path, "r", encoding="utf-8", errors="ignore", buffering=SEARCH_CHUNK_SIZE) as f:
                 # Check first few bytes for binary content
                 try:
                     first_chunk = f.read(1024)
                     # If more than 10% of the first 1024 bytes are null or control chars, likely binary
                     null_count = sum(1 for c in first_chunk if c == '\0' or ord(c) < 32 and c not in '\r\n\t')
                     if null_count > 100:  # 10% threshold
-                        return [{
-                            "file_path": str(file_path),
-                            "skipped": True,
-                            "reason": "Binary file (content check)"
-                        }]
+                        return _skipped_result(file_path_str, "Binary file (content check)")
                     
                     # Reset file pointer
                     f.seek(0)
@@ -760,11 +1329,7 @@ def search_file_content(file_path, search_query_lower, max_results=1000):
                             })
                             break
         except UnicodeDecodeError:
-            return [{
-                "file_path": str(file_path),
-                "skipped": True,
-                "reason": "Binary file or encoding error"
-            }]
+            return _skipped_result(file_path_str, "Binary file or encoding error")
     except UnicodeDecodeError:
         error = "Binary file or encoding error"
     except PermissionError:
@@ -782,50 +1347,250 @@ def search_file_content(file_path, search_query_lower, max_results=1000):
         
     return results
 
-async def file_streamer(file_path, chunk_size, text_mode=False):
+def _read_text(path: pathlib.Path, errors: str = 'strict') -> str:
+    """Read a whole UTF-8 text file; run through run_in_threadpool as a single dispatch."""
+    return path.read_text(encoding='utf-8', errors=errors)
+
+class EditMissError(ValueError):
+    """Raised when an edit's oldText is not present in the file content."""
+    def __init__(self, old_text: str):
+        super().__init__(f"oldText not found in content: '{old_text[:50]}...'")
+        self.old_text = old_text
+
+def _apply_edits_sync(path: pathlib.Path, edits: List["EditOperation"], dry_run: bool,
+                      original: Optional[str] = None) -> Tuple[str, str, Optional[float]]:
     """
-    Generator function that yields chunks of a file.
-    For text files, text_mode should be True to handle encoding properly.
+    Read a file (unless original content is supplied), apply edits in order and,
+    unless dry_run, write the result back atomically via a temp file and os.replace.
+    Runs in the thread pool so the whole read-edit-write is a single dispatch.
+    
+    Returns:
+        Tuple of (original content, modified content, new mtime or None on dry run)
+    """
+    if original is None:
+        original = path.read_text(encoding='utf-8')
+        
+    modified = original
+    for edit in edits:
+        # Locate and splice the first occurrence in one scan instead of `in` + replace()
+        index = modified.find(edit.oldText)
+        if index < 0:
+            raise EditMissError(edit.oldText)
+        modified = modified[:index] + edit.newText + modified[index + len(edit.oldText):]
+        
+    if dry_run:
+        return original, modified, None
+        
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8') as file:
+            file.write(modified)
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+        
+    return original, modified, path.stat().st_mtime
+
+def _append_sync(path: pathlib.Path, content: str) -> None:
+    """
+    Append text to an existing file without reading it back: only the last
+    byte is checked so a newline can be inserted if the file doesn't end in one.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_APPEND)
+    with open(fd, 'r+b') as file:
+        size = os.fstat(fd).st_size
+        needs_newline = size > 0 and os.pread(fd, 1, size - 1) != b'\n'
+        file.write((('\n' if needs_newline else '') + content).encode('utf-8'))
+
+def _prepend_sync(path: pathlib.Path, content: str) -> None:
+    """
+    Prepend text to an existing file by writing it to a temp file, streaming
+    the original after it in chunks and atomically replacing the original.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, 'wb') as out_file, open(path, 'rb') as in_file:
+            out_file.write(content.encode('utf-8'))
+            shutil.copyfileobj(in_file, out_file, 1024 * 1024)
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _list_subdirectories(path_str: str) -> List[str]:
+    """List the paths of a directory's immediate subdirectories, not following symlinks."""
+    with os.scandir(path_str) as it:
+        return [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+
+async def remove_tree(path: pathlib.Path) -> None:
+    """
+    Recursively delete a directory off the event loop. Top-level subdirectories
+    are removed concurrently in the thread pool, each with shutil.rmtree so its
+    symlink-safe fd-based traversal is kept; a final rmtree removes the rest.
+    Directories with fewer than two subdirectories use a single rmtree.
+    """
+    subdirs = await run_in_threadpool(_list_subdirectories, str(path))
+    if len(subdirs) >= 2:
+        await asyncio.gather(*(run_in_threadpool(shutil.rmtree, subdir) for subdir in subdirs))
+    await run_in_threadpool(shutil.rmtree, path)
+
+def _open_direct(path_str: str) -> Optional[int]:
+    """
+    Open a file for reading with O_DIRECT.
+    Returns None if the filesystem does not support direct IO.
+    """
+    try:
+        return os.open(path_str, os.O_RDONLY | os.O_DIRECT)
+    except OSError:
+        return None
+
+def _open_sequential(path_str: str) -> int:
+    """
+    Open a large file for streaming and ask the kernel to read ahead aggressively.
+    Stands in for mmap + madvise: same readahead hints, but no SIGBUS if the
+    file is truncated while it is being streamed.
+    """
+    fd = os.open(path_str, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass  # Hints only; some filesystems don't support them
+    return fd
+
+def _pread_direct(fd: int, buffer: mmap.mmap, offset: int) -> bytes:
+    """Read one aligned chunk at offset into buffer and return the bytes read."""
+    bytes_read = os.preadv(fd, [buffer], offset)
+    return buffer[:bytes_read]
+
+def _close_stream_when_idle(pending, fd: int, buffers: List[mmap.mmap]) -> None:
+    """
+    Close a streaming fd and its buffers once any read-ahead still running
+    in the thread pool has finished with them.
+    """
+    def close(_=None):
+        os.close(fd)
+        for buffer in buffers:
+            buffer.close()
+            
+    if pending:
+        asyncio.gather(*pending, return_exceptions=True).add_done_callback(close)
+    else:
+        close()
+
+async def file_streamer(file_path, chunk_size, file_size=None):
+    """
+    Generator function that yields raw byte chunks of a file.
+    Text files are streamed as-is; the caller sets the Content-Type.
     
     Args:
         file_path: Path to the file to stream
         chunk_size: Size of each chunk to read
-        text_mode: Whether to read as text (True) or binary (False)
+        file_size: Size of the file if already known; large files use O_DIRECT
     """
     # Ensure path is secure - this is a defensive measure in case it wasn't checked by the caller
     if isinstance(file_path, str):
         file_path = pathlib.Path(file_path)
         
     # Additional security check - path should be within allowed directories 
-    valid_path = False
-    for allowed_path in ALLOWED_PATHS:
-        try:
-            file_path.relative_to(allowed_path)
-            valid_path = True
-            break
-        except ValueError:
-            continue
-            
-    if not valid_path:
+    if not is_allowed_path(str(file_path)):
         raise PermissionError(f"Path {file_path} is outside allowed directories")
         
-    # Set correct mode based on file type
-    mode = 'r' if text_mode else 'rb'
-    encoding = 'utf-8' if text_mode else None
-    errors = 'replace' if text_mode else None
-    
-    # Stream the file in chunks
-    async with aiofiles.open(file_path, mode=mode, encoding=encoding, errors=errors) as f:
-        while True:
-            chunk = await f.read(chunk_size)
-            if not chunk:
-                break
+    if not PREAD_AVAILABLE:
+        # Fallback: sequential reads through aiofiles
+        async with aiofiles.open(file_path, mode='rb') as f:
+            while True:
+                chunk = await f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    else:
+        # Open once and read each chunk at an explicit offset, keeping
+        # STREAM_READ_AHEAD reads in flight so the disk queue stays busy
+        fd = None
+        buffers = []
+        if DIRECT_IO_AVAILABLE and file_size is not None and file_size >= DIRECT_IO_MIN_SIZE:
+            fd = await run_in_threadpool(_open_direct, str(file_path))
             
-            # For text mode, we need to encode the text before yielding
-            if text_mode:
-                yield chunk.encode('utf-8')
+        if fd is not None:
+            # Anonymous mmap memory is page-aligned, as O_DIRECT requires.
+            # One buffer per in-flight slot; a slot is reused only after its
+            # previous read has been consumed.
+            step = -(-chunk_size // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+            buffers = [mmap.mmap(-1, step) for _ in range(STREAM_READ_AHEAD)]
+            readers = [functools.partial(_pread_direct, fd, buffer) for buffer in buffers]
+        else:
+            if FADVISE_AVAILABLE and file_size is not None and file_size >= DIRECT_IO_MIN_SIZE:
+                fd = await run_in_threadpool(_open_sequential, str(file_path))
             else:
-                yield chunk
+                fd = await run_in_threadpool(os.open, str(file_path), os.O_RDONLY)
+            step = chunk_size
+            readers = [functools.partial(os.pread, fd, chunk_size)]
+            
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        next_offset = 0
+        
+        def submit_read():
+            nonlocal next_offset
+            reader = readers[(next_offset // step) % len(readers)]
+            pending.append(loop.run_in_executor(THREAD_POOL, reader, next_offset))
+            next_offset += step
+            
+        try:
+            for _ in range(STREAM_READ_AHEAD):
+                submit_read()
+                
+            while True:
+                chunk = await pending.popleft()
+                # A short read means end of file; stop before any later
+                # offsets so a file growing mid-stream can't leave a gap
+                is_last = len(chunk) < step
+                if not is_last:
+                    submit_read()
+                if chunk:
+                    yield chunk
+                if is_last:
+                    break
+        finally:
+            _close_stream_when_idle(pending, fd, buffers)
+
+class PathSendStreamingResponse(StreamingResponse):
+    """
+    Streaming response that lets the ASGI server send the file itself
+    (e.g. with sendfile) when it supports the http.response.pathsend
+    extension, and otherwise streams chunks from the body iterator.
+    """
+    def __init__(self, content, path: pathlib.Path, **kwargs):
+        super().__init__(content, **kwargs)
+        self.path = path
+        
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "http.response.pathsend" not in scope.get("extensions", {}):
+            await super().__call__(scope, receive, send)
+            return
+            
+        # The server copies the file in-kernel; the chunk iterator is never consumed
+        if hasattr(self.body_iterator, "aclose"):
+            await self.body_iterator.aclose()
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+        
+        if self.background is not None:
+            await self.background()
 
 @app.post(
     "/read_file", 
@@ -874,21 +1639,21 @@ async def read_file(data: ReadFileRequest = Body(...)):
     path_str = str(path)
     
     try:
-        # Verify path exists and is a file
-        if not path.exists():
-            raise FileNotFoundError(f"File not found: {data.path}")
-            
-        if not path.is_file():
-            raise ValueError(f"Path is not a file: {data.path}")
-            
+        # A single stat both verifies the path exists and is a file and
+        # provides the metadata used below
         try:
-            # Get file metadata without following symlinks for security
             stat_result = path.stat()
-            modified_time = stat_result.st_mtime
-            file_size = stat_result.st_size
-        except (PermissionError, OSError) as e:
+        except FileNotFoundError:
+            raise
+        except OSError as e:
             # Handle specific file stat errors
             raise PermissionError(f"Cannot access file metadata: {str(e)}")
+            
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise ValueError(f"Path is not a file: {data.path}")
+            
+        modified_time = stat_result.st_mtime
+        file_size = stat_result.st_size
         
         # Use streaming response for large files if requested
         if data.stream:
@@ -905,29 +1670,29 @@ async def read_file(data: ReadFileRequest = Body(...)):
             }
             
             # Set appropriate content type based on file extension
-            is_text_file = path.suffix.lower() in ('.txt', '.md', '.py', '.js', '.css', '.html', '.json', '.xml')
-            if is_text_file:
-                headers["Content-Type"] = "text/plain; charset=utf-8"
-            else:
-                headers["Content-Type"] = "application/octet-stream"
+            headers["Content-Type"] = STREAM_CONTENT_TYPES.get(
+                path.suffix.lower(), "application/octet-stream"
+            )
                 
-            # Use the secure streamer which does additional checks
-            return StreamingResponse(
-                file_streamer(path, data.chunk_size, text_mode=is_text_file),
+            # Use the secure streamer which does additional checks, or
+            # zero-copy pathsend when the server supports it
+            return PathSendStreamingResponse(
+                file_streamer(path, data.chunk_size, file_size=file_size),
+                path=path,
                 headers=headers
             )
         
-        # For normal file reads, use caching with locks
-        with cache_lock:
-            # Check cache first
-            cached_content = get_from_file_cache(path_str, modified_time)
-            if cached_content is not None:
-                return ReadFileResponse(content=cached_content)
+        # For normal file reads, check the cache first (lock-free on hits)
+        cached_content = get_from_file_cache(path_str, modified_time)
+        if cached_content is not None:
+            return ReadFileResponse(content=cached_content)
         
-        # Not in cache, read from disk
+        # Not in cache, read from disk (small files inline, larger ones in the pool)
         try:
-            async with aiofiles.open(path, mode='r', encoding='utf-8', errors='replace') as file:
-                file_content = await file.read()
+            if file_size < INLINE_READ_MAX_SIZE:
+                file_content = _read_text(path, 'replace')
+            else:
+                file_content = await run_in_threadpool(_read_text, path, 'replace')
         except UnicodeDecodeError:
             # Binary file but not streaming mode requested
             raise HTTPException(
@@ -937,8 +1702,7 @@ async def read_file(data: ReadFileRequest = Body(...)):
                 
         # Add to cache if not too large
         if file_size <= FILE_CACHE_ENTRY_MAX_SIZE:
-            with cache_lock:
-                add_to_file_cache(path_str, file_content, modified_time)
+            add_to_file_cache(path_str, file_content, modified_time)
         
         return ReadFileResponse(content=file_content)
     except FileNotFoundError:
@@ -1018,74 +1782,24 @@ async def write_file(data: WriteFileRequest = Body(...)):
         
         # First, invalidate cache for the path before writing
         # This prevents stale reads during file operation
-        with cache_lock:
-            invalidate_cache_for_path(path_str)
-            cache_invalidated = True
+        invalidate_cache_for_path(path_str)
+        cache_invalidated = True
+        
+        # Stat once up front; append/prepend only apply to an existing regular file
+        try:
+            file_exists = stat.S_ISREG(os.stat(path).st_mode)
+        except FileNotFoundError:
+            file_exists = False
         
         try:
             # Handle different write modes
-            if data.mode == "append" and path.exists():
-                # For append mode, we need to read current content first
-                current_content = ""
-                try:
-                    # First read the content
-                    current_content = ""
-                    if path.exists():
-                        async with aiofiles.open(path, mode='r', encoding='utf-8') as file:
-                            current_content = await file.read()
-                    
-                    # For debugging
-                    logger.info(f"Original content: {repr(current_content)}")
-                    logger.info(f"Appending content: {repr(data.content)}")
-                    
-                    # Append new content to current content with proper line handling
-                    # Check if the current content ends with a newline
-                    if current_content and not current_content.endswith('\n'):
-                        # If no newline at end of file, add one before appending
-                        combined_content = current_content + '\n' + data.content
-                    else:
-                        # If already has newline or is empty, just append
-                        combined_content = current_content + data.content
-                    logger.info(f"Combined content: {repr(combined_content)}")
-                    
-                    # Write combined content
-                    async with aiofiles.open(path, mode='w', encoding='utf-8') as file:
-                        await file.write(combined_content)
-                except UnicodeDecodeError:
-                    # If we can't read the file as text, open it in binary mode
-                    # This might happen for binary files
-                    raise HTTPException(
-                        status_code=422,
-                        detail="Cannot append to binary file. Use overwrite mode instead."
-                    )
-            elif data.mode == "prepend" and path.exists():
-                # For prepend mode, we need to read current content first
-                current_content = ""
-                try:
-                    # First read the content
-                    current_content = ""
-                    if path.exists():
-                        async with aiofiles.open(path, mode='r', encoding='utf-8') as file:
-                            current_content = await file.read()
-                    
-                    # For debugging
-                    logger.info(f"Original content: {repr(current_content)}")
-                    logger.info(f"Prepending content: {repr(data.content)}")
-                    
-                    # Prepend new content to current content
-                    combined_content = data.content + current_content
-                    logger.info(f"Combined content: {repr(combined_content)}")
-                    
-                    # Write combined content
-                    async with aiofiles.open(path, mode='w', encoding='utf-8') as file:
-                        await file.write(combined_content)
-                except UnicodeDecodeError:
-                    # If we can't read the file as text, open it in binary mode
-                    # This might happen for binary files
-                    raise HTTPException(
-                        status_code=422,
-                        detail="Cannot prepend to binary file. Use overwrite mode instead."
-                    )
+            if data.mode == "append" and file_exists:
+                # Append only the new bytes instead of rewriting the whole file
+                await run_in_threadpool(_append_sync, path, data.content)
+            elif data.mode == "prepend" and file_exists:
+                # Stream the original after the new content into a temp file
+                # and swap it in, instead of concatenating in memory
+                await run_in_threadpool(_prepend_sync, path, data.content)
             else:
                 # Default: overwrite mode (or file doesn't exist)
                 async with aiofiles.open(path, mode='w', encoding='utf-8') as file:
@@ -1098,21 +1812,12 @@ async def write_file(data: WriteFileRequest = Body(...)):
         # If write succeeded, update cache with the correct content
         modified_time = path.stat().st_mtime
         
-        # For append and prepend modes, we should cache the combined content, not just the new data
-        if data.mode in ("append", "prepend") and path.exists():
-            # Re-read the file to get the correct content for caching
-            async with aiofiles.open(path, mode='r', encoding='utf-8') as file:
-                cache_content = await file.read()
-            add_to_file_cache(path_str, cache_content, modified_time)
-        else:
+        # For append and prepend modes the combined content isn't in memory;
+        # leave the entry invalidated and let the next read populate it
+        if not (data.mode in ("append", "prepend") and file_exists):
             # For overwrite mode, we can just cache the provided content
             add_to_file_cache(path_str, data.content, modified_time)
         
-        # Clear the normalize_path cache if this is a new file
-        # This ensures new paths are recognized correctly
-        if not path.exists():
-            normalize_path.cache_clear()
-        
         # Notify metadata watcher about the change
         if METADATA_API_AVAILABLE:
             try:
@@ -1180,8 +1885,6 @@ async def edit_file(data: EditFileRequest = Body(...)):
     """
     path = normalize_path(data.path)
     path_str = str(path)
-    original = None
-    cache_invalidated = False
     
     try:
         # Check if file exists and get modification time
@@ -1191,81 +1894,54 @@ async def edit_file(data: EditFileRequest = Body(...)):
         modified_time = path.stat().st_mtime
         
         # Check cache first
-        with cache_lock:
-            original = get_from_file_cache(path_str, modified_time)
+        cached = get_from_file_cache(path_str, modified_time)
             
-        if original is None:
-            # Read file asynchronously if not in cache
-            async with aiofiles.open(path, mode='r', encoding='utf-8') as file:
-                original = await file.read()
-                
-            # Cache the original content to avoid redundant reads
-            with cache_lock:
-                add_to_file_cache(path_str, original, modified_time)
+        if not data.dryRun:
+            # Transaction-like pattern: invalidate before the file is rewritten
+            invalidate_cache_for_path(path_str)
+        
+        # Read (on cache miss), apply edits and write back in a single dispatch
+        original, modified, new_modified_time = await run_in_threadpool(
+            _apply_edits_sync, path, data.edits, data.dryRun, cached
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"File not found: {data.path}")
     except PermissionError:
-        raise HTTPException(status_code=403, detail=f"Permission denied to read file: {data.path}")
+        raise HTTPException(status_code=403, detail=f"Permission denied to edit file: {data.path}")
+    except EditMissError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Edit failed: oldText not found in content: '{e.old_text[:50]}...'",
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read file {data.path} for editing: {str(e)}")
-
-    modified = original
-    try:
-        # Apply all edits
-        for edit in data.edits:
-            if edit.oldText not in modified:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Edit failed: oldText not found in content: '{edit.oldText[:50]}...'",
-                )
-            # Replace only the first occurrence
-            modified = modified.replace(edit.oldText, edit.newText, 1)
-
-        # For dry runs, just return diff without modifying the file
-        if data.dryRun:
-            diff_output = difflib.unified_diff(
-                original.splitlines(keepends=True),
-                modified.splitlines(keepends=True),
-                fromfile=f"a/{data.path}",
-                tofile=f"b/{data.path}",
-            )
-            return DiffResponse(diff="".join(diff_output))
+        # We don't try to restore cache - better to have a cache miss than stale data
+        raise HTTPException(status_code=500, detail=f"Failed to edit file {data.path}: {str(e)}")
 
-        # Transaction-like pattern for write operations
-        with cache_lock:
-            # First invalidate cache
-            invalidate_cache_for_path(path_str)
-            cache_invalidated = True
-            
+    # For dry runs, just return diff without modifying the file
+    if data.dryRun:
+        if cached is None:
+            # Cache the original content to avoid redundant reads
+            add_to_file_cache(path_str, original, modified_time)
+        diff_output = difflib.unified_diff(
+            original.splitlines(keepends=True),
+            modified.splitlines(keepends=True),
+            fromfile=f"a/{data.path}",
+            tofile=f"b/{data.path}",
+        )
+        return DiffResponse(diff="".join(diff_output))
+        
+    # Update cache after successful write
+    add_to_file_cache(path_str, modified, new_modified_time)
+    
+    # Notify metadata watcher about the change
+    if METADATA_API_AVAILABLE and WATCHER_AVAILABLE:
         try:
-            # Write changes to disk
-            async with aiofiles.open(path, mode='w', encoding='utf-8') as file:
-                await file.write(modified)
+            watcher.notify_change(path)
         except Exception as e:
-            # If write fails, we can't recover the cache entry
-            # But at least we won't have stale data
-            raise e
-            
-        # Update cache after successful write
-        new_modified_time = path.stat().st_mtime
-        with cache_lock:
-            add_to_file_cache(path_str, modified, new_modified_time)
-        
-        # Notify metadata watcher about the change
-        if METADATA_API_AVAILABLE and WATCHER_AVAILABLE:
-            try:
-                watcher.notify_change(path)
-            except Exception as e:
-                # Log but don't fail if metadata update fails
-                logger.warning(f"Failed to update metadata for {path_str}: {e}")
-        
-        return SuccessResponse(message=f"Successfully edited file {data.path}")
-
-    except PermissionError:
-        raise HTTPException(status_code=403, detail=f"Permission denied to write edited file: {data.path}")
-    except Exception as e:
-        # We don't try to restore cache - better to have a cache miss than stale data
-        raise HTTPException(status_code=500, detail=f"Failed to write edited file {data.path}: {str(e)}")
+            # Log but don't fail if metadata update fails
+            logger.warning(f"Failed to update metadata for {path_str}: {e}")
+    
+    return SuccessResponse(message=f"Successfully edited file {data.path}")
 
 @app.post(
     "/create_directory", 
@@ -1378,23 +2054,23 @@ async def directory_tree(data: DirectoryTreeRequest = Body(...)):
     # Iterative approach to avoid recursion depth issues
     def build_tree_iterative(root_path, max_depth):
         result = []
-        # Queue items contain (path, depth, parent_dict)
-        queue = [(root_path, 0, None)]
+        # Queue items contain (path, name, is_dir, size, depth, parent_dict); children
+        # come from os.scandir so type and size use the DirEntry's cached stat info
+        queue = deque([(str(root_path), root_path.name, True, None, 0, None)])
         
         while queue:
-            current_path, current_depth, parent = queue.pop(0)
+            current_path, name, is_dir, size, current_depth, parent = queue.popleft()
             
             # Skip hidden files/dirs if not included
-            if not data.include_hidden and current_path.name.startswith('.'):
+            if not data.include_hidden and name.startswith('.'):
                 continue
                 
             # Create entry for current item
-            is_dir = current_path.is_dir()
             entry = {
-                "name": current_path.name,
+                "name": name,
                 "type": "directory" if is_dir else "file",
-                "path": str(current_path),
-                "size": current_path.stat().st_size if current_path.is_file() else None
+                "path": current_path,
+                "size": size
             }
             
             # If this is a directory and we haven't reached max depth, process children
@@ -1402,9 +2078,20 @@ async def directory_tree(data: DirectoryTreeRequest = Body(...)):
                 entry["children"] = []
                 
                 try:
+                    with os.scandir(current_path) as it:
+                        children = [
+                            (child, child.is_dir())
+                            for child in it
+                        ]
                     # Add children to the queue, sorting directories first
-                    for child in sorted(current_path.iterdir(), key=lambda p: (not p.is_dir(), p.name)):
-                        queue.append((child, current_depth + 1, entry))
+                    children.sort(key=lambda c: (not c[1], c[0].name))
+                    for child, child_is_dir in children:
+                        child_size = (
+                            child.stat().st_size
+                            if child.is_file() else None
+                        )
+                        queue.append((child.path, child.name, child_is_dir, child_size,
+                                      current_depth + 1, entry))
                 except PermissionError:
                     entry["error"] = "Permission denied"
                 except Exception as e:
@@ -1418,8 +2105,11 @@ async def directory_tree(data: DirectoryTreeRequest = Body(...)):
                 
         return result
 
-    # Process in a thread to avoid blocking the event loop
-    tree = await run_in_threadpool(build_tree_iterative, base_path, data.max_depth)
+    # Shallow trees are built inline; deeper ones in a thread to avoid blocking the event loop
+    if data.max_depth <= INLINE_TREE_MAX_DEPTH:
+        tree = build_tree_iterative(base_path, data.max_depth)
+    else:
+        tree = await run_in_threadpool(build_tree_iterative, base_path, data.max_depth)
     return {"tree": tree}
 
 @app.post(
@@ -1487,6 +2177,8 @@ async def search_content(data: SearchContentRequest = Body(...)):
     start_time = datetime.now()
     base_path = normalize_path(data.path)
     search_query_lower = data.search_query.lower()
+    # Compile the query once for all files rather than per file
+    search_pattern = compile_search_query(search_query_lower)
     all_results = []
     errors = []
     stats = {
@@ -1497,82 +2189,112 @@ async def search_content(data: SearchContentRequest = Body(...)):
         "search_time_ms": 0,
     }
 
-    if not base_path.is_dir():
+    try:
+        base_stat = base_path.stat()
+    except OSError:
+        base_stat = None
+    if base_stat is None or not stat.S_ISDIR(base_stat.st_mode):
         raise HTTPException(status_code=400, detail="Provided path is not a directory")
+        
+    offset = data.pagination.offset
+    limit = data.pagination.limit
+    target = offset + limit
+    
+    # Serve repeated searches from the search cache
+    cache_key = (str(base_path), data.file_pattern, data.recursive, search_query_lower)
+    cached = await get_cached_search(cache_key, target)
+    if cached is not None:
+        return SearchContentResponse(
+            items=cached['results'][offset:offset + limit],
+            total=len(cached['results']),
+            offset=offset,
+            limit=limit,
+            errors=cached['errors'],
+            stats={**cached['stats'], "cached": True}
+        )
 
-    # Collect all files first to enable proper pagination
+    # Limit number of files to search to prevent resource exhaustion
+    max_files = 10000  # Arbitrary limit to prevent abuse
+    
+    # Collect files first to enable proper pagination; the walk stops as soon
+    # as the limit is exceeded instead of listing the whole tree. The walk runs
+    # in the search pool so a large tree doesn't block the event loop
     try:
-        if data.recursive:
-            files = list(base_path.rglob(data.file_pattern))
-        else:
-            files = list(base_path.glob(data.file_pattern))
+        files, walked_dirs = await asyncio.get_running_loop().run_in_executor(
+            SEARCH_THREAD_POOL, _collect_files, base_path, data.file_pattern or "*",
+            data.recursive, max_files + 1
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error collecting files to search: {str(e)}"
         )
     
-    # Filter to only include files (not directories)
-    files = [f for f in files if f.is_file()]
     stats["total_files"] = len(files)
     
-    # Limit number of files to search to prevent resource exhaustion
-    max_files = 10000  # Arbitrary limit to prevent abuse
     if len(files) > max_files:
         files = files[:max_files]
-        errors.append({
+        _push_error(errors, {
             "type": "limit_exceeded",
             "message": f"Too many files to search. Limited to {max_files} files."
         })
     
-    # Process files in parallel using thread pool, with concurrency control
-    # This significantly speeds up IO-bound file operations
-    search_tasks = []
-    max_concurrency = min(100, len(files))  # Limit concurrency to avoid resource exhaustion
+    # Snapshot mtimes for the search cache before any file is read, so a change
+    # made during the search invalidates the entry rather than hiding in it
+    mtimes = None
+    if walked_dirs is not None:
+        mtimes = await asyncio.get_running_loop().run_in_executor(
+            SEARCH_THREAD_POOL, path_mtimes, walked_dirs + files
+        )
     
-    # Create batches of files to process
-    for i in range(0, len(files), max_concurrency):
-        batch = files[i:i + max_concurrency]
-        batch_tasks = []
-        
-        for file_path in batch:
-            try:
-                batch_tasks.append(
-                    run_in_threadpool(search_file_content, file_path, search_query_lower)
-                )
-            except Exception as e:
-                errors.append({
-                    "file": str(file_path),
-                    "error": f"Failed to create search task: {str(e)}"
-                })
-                
-        if batch_tasks:
-            # Process each batch with gather for concurrent execution
+    # Process files in parallel using the search thread pool, with concurrency control
+    # This significantly speeds up IO-bound file operations. Every file gets a
+    # task up front and a semaphore keeps at most max_concurrency of them in the
+    # pool, so a slow file no longer holds back a whole batch; results are still
+    # consumed in file order so pagination stays stable
+    max_concurrency = 100  # Limit concurrency to avoid resource exhaustion
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    loop = asyncio.get_running_loop()
+    search = functools.partial(search_file_content, search_pattern=search_pattern)
+    
+    async def search_one(file_path):
+        # Known binary extensions return their skip result straight away,
+        # without a stat or a thread pool round trip
+        if has_binary_extension(file_path):
+            return search(file_path, search_query_lower)
+        async with semaphore:
+            return await loop.run_in_executor(SEARCH_THREAD_POOL, search, file_path, search_query_lower)
+    
+    # Stop once there is one result past the requested page (target): enough
+    # to fill it and to know more exist, in which case total is a lower bound
+    search_tasks = [asyncio.create_task(search_one(file_path)) for file_path in files]
+    try:
+        for task in search_tasks:
+            stats["processed_files"] += 1
             try:
-                batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                
-                for result in batch_results:
-                    stats["processed_files"] += 1
-                    
-                    # Handle exceptions from gather
-                    if isinstance(result, Exception):
-                        errors.append({
-                            "error": f"Search thread error: {str(result)}"
-                        })
-                        stats["errors"] += 1
-                        continue
-                        
-                    # Check for skipped files
-                    if result and len(result) == 1 and "skipped" in result[0]:
-                        stats["skipped_files"] += 1
-                    
-                    # Add valid results
-                    all_results.extend(result)
+                result = await task
             except Exception as e:
-                errors.append({
-                    "error": f"Batch processing error: {str(e)}"
+                _push_error(errors, {
+                    "error": f"Search thread error: {str(e)}"
                 })
                 stats["errors"] += 1
+                continue
+                
+            # Check for skipped files
+            if type(result) is SkippedResult:
+                stats["skipped_files"] += 1
+            
+            # Add valid results
+            all_results.extend(result)
+            
+            if len(all_results) > target:
+                stats["stopped_early"] = True
+                break
+    finally:
+        # Don't leave searches queued if the request is cancelled
+        for task in search_tasks:
+            task.cancel()
     
     # Identify and group errors by type for cleaner reporting
     error_files = [r["file_path"] for r in all_results if "error" in r]
@@ -1583,17 +2305,21 @@ async def search_content(data: SearchContentRequest = Body(...)):
     stats["search_time_ms"] = int((datetime.now() - start_time).total_seconds() * 1000)
     
     # Apply pagination
-    offset = data.pagination.offset
-    limit = data.pagination.limit
     total_matches = len(all_results)
     paginated_results = all_results[offset:offset + limit]
     
+    if mtimes is not None:
+        add_cached_search(
+            cache_key, mtimes, target if stats.get("stopped_early") else None,
+            all_results, errors, dict(stats)
+        )
+    
     return SearchContentResponse(
         items=paginated_results,
         total=total_matches,
         offset=offset,
         limit=limit,
-        errors=errors[:100],  # Limit number of errors reported
+        errors=errors,  # Bounded by _push_error
         stats=stats
     )
 
@@ -1664,14 +2390,11 @@ async def delete_path(data: DeletePathRequest = Body(...)):
             # Invalidate cache before deleting the file
             invalidate_cache_for_path(path_str)
             path.unlink()
+            invalidate_normalized_paths(path_str)
             
-            # Update metadata after deletion
+            # Update metadata after deletion, without holding up the response
             if METADATA_API_AVAILABLE:
-                try:
-                    await db.delete_metadata(path_str)
-                except Exception as e:
-                    # Log but don't fail if metadata update fails
-                    logger.warning(f"Failed to update metadata for deleted file {path_str}: {e}")
+                run_in_background(db.delete_metadata(path_str), f"update metadata for deleted file {path_str}")
                     
             return SuccessResponse(message=f"Successfully deleted file: {data.path}")
         elif path.is_dir():
@@ -1679,28 +2402,22 @@ async def delete_path(data: DeletePathRequest = Body(...)):
             invalidate_cache_for_path(path_str)
             
             if data.recursive:
-                shutil.rmtree(path)
+                await remove_tree(path)
+                invalidate_normalized_paths(path_str)
                 
-                # Update metadata after deletion
+                # Update metadata after deletion, removing the whole subtree in one statement
                 if METADATA_API_AVAILABLE:
-                    try:
-                        await db.delete_metadata(path_str)
-                    except Exception as e:
-                        # Log but don't fail if metadata update fails
-                        logger.warning(f"Failed to update metadata for deleted directory {path_str}: {e}")
+                    run_in_background(db.delete_metadata_prefix(path_str), f"update metadata for deleted directory {path_str}")
                         
                 return SuccessResponse(message=f"Successfully deleted directory recursively: {data.path}")
             else:
                 try:
                     path.rmdir()
+                    invalidate_normalized_paths(path_str)
                     
                     # Update metadata after deletion
                     if METADATA_API_AVAILABLE:
-                        try:
-                            await db.delete_metadata(path_str)
-                        except Exception as e:
-                            # Log but don't fail if metadata update fails
-                            logger.warning(f"Failed to update metadata for deleted directory {path_str}: {e}")
+                        run_in_background(db.delete_metadata(path_str), f"update metadata for deleted directory {path_str}")
                             
                     return SuccessResponse(message=f"Successfully deleted empty directory: {data.path}")
                 except OSError as e:
@@ -1772,31 +2489,30 @@ async def move_path(data: MovePathRequest = Body(...)):
         # Invalidate source path in cache before moving
         invalidate_cache_for_path(str(source))
         
-        # Perform the move operation
-        shutil.move(str(source), str(destination))
+        # Perform the move operation; moving into an existing directory lands
+        # at destination/<name>, which shutil.move returns
+        moved_to = pathlib.Path(shutil.move(str(source), str(destination)))
         
         # Invalidate destination path in cache to ensure fresh reads
         invalidate_cache_for_path(str(destination))
         
-        # Clear the normalize_path cache since path relationships may have changed
-        normalize_path.cache_clear()
+        # Drop cached path normalizations through the source or destination,
+        # since symlinks under them may now resolve differently
+        invalidate_normalized_paths(str(source))
+        invalidate_normalized_paths(str(destination))
         
         # Update metadata index for the moved files/directories
+        # in the background, without holding up the response
         if METADATA_API_AVAILABLE:
-            try:
-                # For metadata, we need to:
-                # 1. Remove the old entries
-                # 2. Add the new entries
+            async def update_moved_metadata():
+                # Rewrite the moved entries' paths in place with bulk updates
+                await db.move_metadata_prefix(source, moved_to)
                 
-                # Delete old metadata entries
-                await db.delete_metadata(str(source))
-                
-                # Notify watcher to add new entries if it's available
+                # Notify watcher to refresh the moved entry's stat-derived columns
                 if WATCHER_AVAILABLE:
-                    watcher.notify_change(destination)
-            except Exception as e:
-                # Log but don't fail if metadata update fails
-                logger.warning(f"Failed to update metadata for move operation: {e}")
+                    watcher.notify_change(moved_to)
+                    
+            run_in_background(update_moved_metadata(), "update metadata for move operation")
         
         return SuccessResponse(message=f"Successfully moved '{data.source_path}' to '{data.destination_path}'")
 
@@ -1858,11 +2574,11 @@ async def get_metadata(data: GetMetadataRequest = Body(...)):
         else:
             file_type = "other"
 
-        mod_time = datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc).isoformat()
+        mod_time = format_utc_timestamp(stat_result.st_mtime)
         try:
-            create_time = datetime.fromtimestamp(stat_result.st_birthtime, tz=timezone.utc).isoformat()
+            create_time = format_utc_timestamp(stat_result.st_birthtime)
         except AttributeError:
-            create_time = datetime.fromtimestamp(stat_result.st_ctime, tz=timezone.utc).isoformat()
+            create_time = format_utc_timestamp(stat_result.st_ctime)
 
         metadata = {
             "path": str(path),
@@ -1870,7 +2586,7 @@ async def get_metadata(data: GetMetadataRequest = Body(...)):
             "size_bytes": stat_result.st_size,
             "modification_time_utc": mod_time,
             "creation_time_utc": create_time,
-            "last_metadata_change_time_utc": datetime.fromtimestamp(stat_result.st_ctime, tz=timezone.utc).isoformat(),
+            "last_metadata_change_time_utc": format_utc_timestamp(stat_result.st_ctime),
         }
         return metadata
 
@@ -2072,6 +2788,8 @@ class DirectoryRequest(BaseModel):
     sort_by: Optional[str] = Field("name", description="Sort field (name, size, modified)")
     sort_order: Optional[str] = Field("asc", description="Sort order (asc, desc)")
     include_details: bool = Field(True, description="Include detailed file stats")
+    offset: int = Field(0, description="Number of entries to skip", ge=0)
+    limit: Optional[int] = Field(None, description="Maximum number of entries to return (all if omitted)", ge=1)
 
 class FileItem(BaseModel):
     """File or directory entry model."""
@@ -2141,127 +2859,157 @@ async def list_directory(request: DirectoryRequest = Body(...)):
         # Validate and normalize path
         dir_path = normalize_path(request.path)
         
-        if not dir_path.exists():
+        try:
+            dir_stat = dir_path.stat()
+        except OSError:
+            dir_stat = None
+        if dir_stat is None:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Directory not found: {request.path}"
             )
             
-        if not dir_path.is_dir():
+        if not stat.S_ISDIR(dir_stat.st_mode):
             raise HTTPException(
                 status_code=400, 
                 detail=f"Path is not a directory: {request.path}"
             )
         
-        # Prepare response
-        items = []
+        # Serve replayed requests from the response cache
+        cache_key = (str(dir_path), "list_directory", request.model_dump_json())
+        cached = get_cached_response(cache_key, dir_stat.st_mtime_ns)
+        if cached is not None:
+            return cached
+        
+        # Requested page of entries
+        start = request.offset
+        stop = start + request.limit if request.limit is not None else None
+        
+        def build_item(entry):
+            # Symlinks are reported by their targets, as Path.is_dir() and stat() did
+            is_dir = entry.is_dir()
+            item = {
+                "name": entry.name,
+                "path": entry.path,
+                "is_directory": is_dir
+            }
+            
+            # Include additional details if requested
+            if request.include_details:
+                try:
+                    stat_result = entry.stat()
+                    
+                    # Size (zero for directories)
+                    item["size_bytes"] = 0 if is_dir else stat_result.st_size
+                    
+                    # Timestamps
+                    item["modified_time"] = format_utc_timestamp(stat_result.st_mtime)
+                    
+                    try:
+                        # This may not be available on all platforms
+                        created_time = stat_result.st_birthtime
+                    except AttributeError:
+                        # Fallback to ctime if birthtime is not available
+                        created_time = stat_result.st_ctime
+                        
+                    item["created_time"] = format_utc_timestamp(created_time)
+                    
+                    # File type info (only for files)
+                    if not is_dir:
+                        # Plain string slicing; a leading dot (hidden file) is not an extension
+                        name = entry.name
+                        dot = name.rfind('.')
+                        suffix = name[dot:].lower() if dot > 0 else ''
+                        item["extension"] = suffix or None
+                        item["mime_type"] = EXTENSION_MIME_TYPES.get(suffix, 'application/octet-stream')
+                        
+                except (PermissionError, OSError) as e:
+                    # Handle errors getting file stats
+                    pass
+                    
+            return item
         
-        # Get directory entries
-        try:
-            entries = list(dir_path.iterdir())
-                
-            # Handle hidden files
-            if not request.include_hidden:
-                entries = [e for e in entries if not e.name.startswith('.')]
-                
-            # Process each entry
+        def iter_items(entries):
+            # Lazily build items so only the requested page gets its details
             for entry in entries:
                 try:
-                    is_dir = entry.is_dir()
-                    item = {
-                        "name": entry.name,
-                        "path": str(entry),
-                        "is_directory": is_dir
-                    }
-                    
-                    # Include additional details if requested
-                    if request.include_details:
-                        try:
-                            stat_result = entry.stat()
-                            
-                            # Size (zero for directories)
-                            item["size_bytes"] = 0 if is_dir else stat_result.st_size
-                            
-                            # Timestamps
-                            item["modified_time"] = datetime.fromtimestamp(
-                                stat_result.st_mtime, timezone.utc
-                            ).isoformat()
-                            
-                            try:
-                                # This may not be available on all platforms
-                                created_time = stat_result.st_birthtime
-                            except AttributeError:
-                                # Fallback to ctime if birthtime is not available
-                                created_time = stat_result.st_ctime
-                                
-                            item["created_time"] = datetime.fromtimestamp(
-                                created_time, timezone.utc
-                            ).isoformat()
-                            
-                            # File type info (only for files)
-                            if not is_dir:
-                                item["extension"] = entry.suffix.lower() if entry.suffix else None
-                                
-                                # Simple mime type inference
-                                mime_map = {
-                                    '.txt': 'text/plain',
-                                    '.html': 'text/html',
-                                    '.htm': 'text/html',
-                                    '.css': 'text/css',
-                                    '.js': 'application/javascript',
-                                    '.json': 'application/json',
-                                    '.xml': 'application/xml',
-                                    '.jpg': 'image/jpeg',
-                                    '.jpeg': 'image/jpeg',
-                                    '.png': 'image/png',
-                                    '.gif': 'image/gif',
-                                    '.pdf': 'application/pdf',
-                                    '.zip': 'application/zip',
-                                    '.md': 'text/markdown',
-                                    '.py': 'text/x-python',
-                                    '.csv': 'text/csv'
-                                }
-                                
-                                ext = entry.suffix.lower() if entry.suffix else ''
-                                item["mime_type"] = mime_map.get(ext, 'application/octet-stream')
-                                
-                        except (PermissionError, OSError) as e:
-                            # Handle errors getting file stats
-                            pass
-                            
-                    items.append(item)
+                    yield build_item(entry)
                 except Exception as e:
                     # Skip entries that cause errors
                     continue
-            
-            # Sort items
-            if request.sort_by:
-                # Default sort value if the field is missing
-                default_values = {
-                    "size_bytes": 0,
-                    "modified_time": "1970-01-01T00:00:00+00:00",
-                    "created_time": "1970-01-01T00:00:00+00:00",
-                    "name": "",
-                    "extension": ""
-                }
+        
+        def read_items():
+            # Directory reads and stats block, so they run in the thread pool
+            # to keep the event loop free for other requests
+            # os.scandir yields DirEntry objects whose type comes from the directory
+            # read itself, so only the details need a stat call. The C readdir loop
+            # already batches getdents64 and beats parsing dirents in Python
+            with os.scandir(dir_path) as it:
+                # Handle hidden files
+                entries = (e for e in it if request.include_hidden or not e.name.startswith('.'))
                 
-                reverse = request.sort_order.lower() == "desc"
+                if not request.sort_by:
+                    # Unsorted listings stream from the directory and stop at the end of the page
+                    items = list(itertools.islice(iter_items(entries), start, stop))
+                else:
+                    # Split directories from files as the entries are read, so each
+                    # group is sorted on its own and the groups are joined once
+                    dir_entries = []
+                    file_entries = []
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        (dir_entries if is_dir else file_entries).append(entry)
+            
+            reverse = (request.sort_order or "asc").lower() == "desc"
+            sort_by = request.sort_by
+            
+            if sort_by == "name":
+                # Name order (directories first, in both sort orders) needs no stat,
+                # so sort the entries themselves and only build the requested page
+                dir_entries.sort(key=lambda e: e.name, reverse=reverse)
+                file_entries.sort(key=lambda e: e.name, reverse=reverse)
+                items = list(itertools.islice(
+                    iter_items(itertools.chain(dir_entries, file_entries)), start, stop
+                ))
+            elif sort_by:
+                # Other sort fields depend on the details, so every entry is built
+                dir_items = list(iter_items(dir_entries))
+                file_items = list(iter_items(file_entries))
                 
-                def get_sort_key(item):
-                    # Handle potential missing keys
-                    return item.get(request.sort_by, default_values.get(request.sort_by, ""))
+                if sort_by == "is_directory":
+                    # The key is constant within each group; only the group order changes
+                    groups = (dir_items, file_items) if reverse else (file_items, dir_items)
+                else:
+                    # Sort items, with a default sort value if the field is missing
+                    default_values = {
+                        "size_bytes": 0,
+                        "modified_time": "1970-01-01T00:00:00+00:00",
+                        "created_time": "1970-01-01T00:00:00+00:00",
+                        "name": "",
+                        "extension": ""
+                    }
+                    default_value = default_values.get(sort_by, "")
                     
-                items.sort(key=get_sort_key, reverse=reverse)
-                
-                # Always put directories first regardless of sort
-                if request.sort_by != "is_directory":
-                    dir_items = [item for item in items if item["is_directory"]]
-                    file_items = [item for item in items if not item["is_directory"]]
+                    def get_sort_key(item):
+                        # Handle potential missing keys
+                        return item.get(sort_by, default_value)
+                        
+                    dir_items.sort(key=get_sort_key, reverse=reverse)
+                    file_items.sort(key=get_sort_key, reverse=reverse)
                     
-                    if reverse:
-                        items = dir_items + file_items
-                    else:
-                        items = dir_items + file_items
+                    # Always put directories first regardless of sort order; only
+                    # sort_by="is_directory" lets descending order flip the groups
+                    groups = (dir_items, file_items)
+                    
+                items = list(itertools.islice(itertools.chain(*groups), start, stop))
+            return items
+        
+        # Get directory entries
+        try:
+            items = await run_in_threadpool(read_items)
                 
         except (PermissionError, OSError) as e:
             raise HTTPException(
@@ -2272,12 +3020,14 @@ async def list_directory(request: DirectoryRequest = Body(...)):
         # Calculate parent directory (if not at root)
         parent_dir = str(dir_path.parent) if str(dir_path) != "/" else None
         
-        return DirectoryResponse(
+        response = DirectoryResponse(
             path=str(dir_path),
             items=items,
             item_count=len(items),
             parent_directory=parent_dir
         )
+        add_cached_response(cache_key, dir_stat.st_mtime_ns, response)
+        return response
             
     except HTTPException:
         raise
@@ -2313,6 +3063,7 @@ class SearchResponse(BaseModel):
 
 @app.post(
     "/search_files", 
+    response_model=SearchResponse,
     summary="Search for files",
     description="""
     Search for files matching various criteria.
@@ -2379,32 +3130,47 @@ async def search_files(request: SearchRequest = Body(...)):
     For large directories, the search is performed asynchronously
     with a configurable timeout.
     """
+    return await _search_files(request)
+
+async def _search_files(request: SearchRequest, use_response_cache: bool = True) -> SearchResponse:
+    """
+    search_files itself. With use_response_cache False the response cache is
+    neither read nor filled, so the listing reflects the filesystem (or index) now.
+    """
     start_time = time.time()
     
     try:
         # Validate and normalize the base path
         base_path = normalize_path(request.path)
         
-        if not base_path.exists():
+        try:
+            base_stat = base_path.stat()
+        except OSError:
+            base_stat = None
+        if base_stat is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Path not found: {request.path}"
             )
             
-        if not base_path.is_dir():
+        if not stat.S_ISDIR(base_stat.st_mode):
             raise HTTPException(
                 status_code=400,
                 detail=f"Path is not a directory: {request.path}"
             )
         
+        # Serve replayed requests from the response cache
+        cache_key = (str(base_path), "search_files", request.model_dump_json())
+        cached = get_cached_response(cache_key, base_stat.st_mtime_ns) if use_response_cache else None
+        if cached is not None:
+            return cached.model_copy(update={"execution_time_seconds": time.time() - start_time})
+        
         # If we have a database, use it for more efficient searching
         if METADATA_API_AVAILABLE:
-            # Prepare search parameters
+            # Prepare search filters
             search_params = {
                 "query": request.pattern if request.pattern else None,
                 "path_prefix": str(base_path),
-                "limit": request.pagination.get("limit", 100) + 1,  # +1 to check if more results
-                "offset": request.pagination.get("offset", 0),
             }
             
             # Add file extensions filter
@@ -2428,9 +3194,20 @@ async def search_files(request: SearchRequest = Body(...)):
                 
             if request.modified_before:
                 search_params["modified_before"] = request.modified_before
-                
-            # Execute search
-            results = await db.search_metadata(**search_params)
+
+            # Non-recursive searches only look at the base directory's entries
+            if not request.recursive:
+                search_params["max_depth"] = 1
+
+            # Fetch the page and the total match count concurrently
+            results, total = await asyncio.gather(
+                db.search_metadata(
+                    **search_params,
+                    limit=request.pagination.get("limit", 100) + 1,  # +1 to check if more results
+                    offset=request.pagination.get("offset", 0),
+                ),
+                db.search_metadata_count(**search_params),
+            )
             
             # Check if we have more results
             has_more = len(results) > request.pagination.get("limit", 100)
@@ -2453,200 +3230,273 @@ async def search_files(request: SearchRequest = Body(...)):
                     
                 items.append(entry)
                 
-            return SearchResponse(
+            response = SearchResponse(
                 items=items,
-                total=len(items) + request.pagination.get("offset", 0) + (1 if has_more else 0),
+                total=total,
                 has_more=has_more,
                 execution_time_seconds=time.time() - start_time
             )
+            if use_response_cache:
+                add_cached_response(cache_key, base_stat.st_mtime_ns, response)
+            return response
             
         else:
             # Fallback to file system search if no database
             # Use concurrent.futures to handle file system searching in a thread pool
             # to avoid blocking the async event loop
             
-            # Prepare the search results
-            all_matches = []
-            total_count = 0
-            scan_complete = False
+            # Requested page; the walk keeps only these matches
+            offset = request.pagination.get("offset", 0)
+            limit = request.pagination.get("limit", 100)
+            # Set to stop the walk early when the timeout is reached
+            cancelled = threading.Event()
+            
+            # Filters are prepared once here rather than for every entry
+            exclude_match = compile_glob_union(tuple(sorted(request.excludePatterns)))
+            allowed_exts = extension_set(tuple(sorted(request.file_types or ())))
+            pattern_folded = (
+                request.pattern.casefold()
+                if request.pattern and not request.case_sensitive else None
+            )
+            # Date filters are compared against raw st_mtime values
+            modified_after = request.modified_after.timestamp() if request.modified_after else None
+            modified_before = request.modified_before.timestamp() if request.modified_before else None
             
             # Define the search function to run in a thread
-            def thread_search():
-                nonlocal all_matches, total_count, scan_complete
-                
+            def is_excluded(path_str):
+                # Check if path matches any exclude pattern
+                return exclude_match is not None and exclude_match(os.path.normcase(path_str)) is not None
+            
+            def scan_directory(dir_path):
+                """
+                List one directory and match its entries, returning the matches
+                and the subdirectories still to walk, as (path, (st_dev, st_ino))
+                pairs. DirEntry type info comes from the directory read, so only
+                matched entries and subdirectories need a stat, and entries stay
+                plain strings (entry.name, entry.path) with no pathlib objects.
+                """
+                matches = []
                 try:
-                    matches = []
-                    count = 0
+                    with os.scandir(dir_path) as it:
+                        entries = list(it)
+                except OSError:
+                    # Unreadable or vanished directory; skip it like os.walk does
+                    return matches, []
                     
-                    # Convert exclude patterns to use pathlib
-                    import fnmatch
+                dirs = []
+                files = []
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # Skip excluded and hidden directories
+                        if not (is_excluded(entry.name) or entry.name.startswith('.')):
+                            dirs.append(entry)
+                    else:
+                        files.append(entry)
+                        
+                # Process directories
+                for entry in dirs:
+                    full_path = entry.path
                     
-                    def is_excluded(path_str):
-                        # Check if path matches any exclude pattern
-                        for pattern in request.excludePatterns:
-                            if fnmatch.fnmatch(path_str, pattern):
-                                return True
-                        return False
+                    # Skip if excluded
+                    if is_excluded(full_path):
+                        continue
+                        
+                    # Check if it matches pattern
+                    if request.pattern and request.pattern not in full_path:
+                        continue
+                        
+                    # Get directory stats; DirEntry.stat() caches its result and, for
+                    # symlinks, reuses the stat is_dir() already made
+                    try:
+                        modified_time = entry.stat().st_mtime
+                        
+                        # Apply date filters
+                        if modified_after is not None and modified_time < modified_after:
+                            continue
+                            
+                        if modified_before is not None and modified_time > modified_before:
+                            continue
+                            
+                        # Add to results; modified_time is formatted once the page is known
+                        matches.append({
+                            "name": entry.name,
+                            "path": full_path,
+                            "type": "directory",
+                            "modified_time": modified_time,
+                            "size_bytes": 0
+                        })
+                    except (PermissionError, OSError):
+                        # Skip if error accessing directory
+                        continue
+                        
+                # Process files
+                for entry in files:
+                    full_path = entry.path
                     
-                    # Walk directory
-                    for root, dirs, files in os.walk(base_path):
-                        # Skip excluded directories
-                        dirs_to_remove = []
-                        for d in dirs:
-                            if is_excluded(d) or d.startswith('.'):
-                                dirs_to_remove.append(d)
+                    # Skip if excluded
+                    if is_excluded(full_path):
+                        continue
                         
-                        for d in dirs_to_remove:
-                            dirs.remove(d)
+                    # Same rule as pathlib's suffix: no leading or trailing dot
+                    name = entry.name
+                    dot = name.rfind('.')
+                    suffix = name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+                    
+                    # Check extension filter
+                    if allowed_exts:
+                        if not suffix or suffix[1:] not in allowed_exts:
+                            continue
                             
-                        # Stop recursion if not recursive
-                        if not request.recursive and root != str(base_path):
-                            dirs.clear()
+                    # Check if it matches pattern
+                    if pattern_folded is not None:
+                        if pattern_folded not in full_path.casefold():
+                            continue
+                    elif request.pattern:
+                        if request.pattern not in full_path:
+                            continue
+                    
+                    # Get file stats (the only syscall per matched file)
+                    try:
+                        stat_result = entry.stat()
+                        size = stat_result.st_size
+                        modified_time = stat_result.st_mtime
+                        
+                        # Apply size filters
+                        if request.min_size is not None and size < request.min_size:
                             continue
                             
-                        # Process directories
-                        for d in dirs:
-                            dir_path = pathlib.Path(root) / d
-                            full_path = str(dir_path)
+                        if request.max_size is not None and size > request.max_size:
+                            continue
                             
-                            # Skip if excluded
-                            if is_excluded(full_path):
-                                continue
-                                
-                            # Check if it matches pattern
-                            if request.pattern and request.pattern not in full_path:
-                                continue
-                                
-                            # Get directory stats
-                            try:
-                                stat_result = dir_path.stat()
-                                modified_time = datetime.fromtimestamp(stat_result.st_mtime, timezone.utc)
-                                
-                                # Apply date filters
-                                if request.modified_after and modified_time < request.modified_after:
-                                    continue
-                                    
-                                if request.modified_before and modified_time > request.modified_before:
-                                    continue
-                                    
-                                # Add to results
-                                result = {
-                                    "name": d,
-                                    "path": full_path,
-                                    "type": "directory",
-                                    "modified_time": modified_time.isoformat(),
-                                    "size_bytes": 0
-                                }
-                                
-                                count += 1
-                                matches.append(result)
-                            except (PermissionError, OSError):
-                                # Skip if error accessing directory
-                                continue
-                                
-                        # Process files
-                        for f in files:
-                            file_path = pathlib.Path(root) / f
-                            full_path = str(file_path)
+                        # Apply date filters
+                        if modified_after is not None and modified_time < modified_after:
+                            continue
                             
-                            # Skip if excluded
-                            if is_excluded(full_path):
-                                continue
-                                
-                            # Check extension filter
-                            if request.file_types:
-                                ext = file_path.suffix.lower()
-                                if not ext or ext[1:] not in [t.lstrip('.').lower() for t in request.file_types]:
-                                    continue
-                                    
-                            # Check if it matches pattern
-                            if request.pattern:
-                                if not request.case_sensitive:
-                                    if request.pattern.lower() not in full_path.lower():
-                                        continue
-                                else:
-                                    if request.pattern not in full_path:
-                                        continue
+                        if modified_before is not None and modified_time > modified_before:
+                            continue
                             
-                            # Get file stats
-                            try:
-                                stat_result = file_path.stat()
-                                size = stat_result.st_size
-                                modified_time = datetime.fromtimestamp(stat_result.st_mtime, timezone.utc)
-                                
-                                # Apply size filters
-                                if request.min_size is not None and size < request.min_size:
-                                    continue
-                                    
-                                if request.max_size is not None and size > request.max_size:
-                                    continue
-                                    
-                                # Apply date filters
-                                if request.modified_after and modified_time < request.modified_after:
-                                    continue
-                                    
-                                if request.modified_before and modified_time > request.modified_before:
-                                    continue
-                                    
-                                # Add to results
-                                result = {
-                                    "name": f,
-                                    "path": full_path,
-                                    "type": "file",
-                                    "size_bytes": size,
-                                    "modified_time": modified_time.isoformat(),
-                                    "extension": file_path.suffix.lower() if file_path.suffix else None
-                                }
-                                
-                                count += 1
-                                matches.append(result)
-                            except (PermissionError, OSError):
-                                # Skip if error accessing file
-                                continue
-                                
-                    # Update the shared results
-                    all_matches = matches
-                    total_count = count
-                    
+                        # Add to results; modified_time is formatted once the page is known
+                        matches.append({
+                            "name": entry.name,
+                            "path": full_path,
+                            "type": "file",
+                            "size_bytes": size,
+                            "modified_time": modified_time,
+                            "extension": suffix or None
+                        })
+                    except (PermissionError, OSError):
+                        # Skip if error accessing file
+                        continue
+                        
+                # Only the base directory is listed for non-recursive searches;
+                # symlinked directories are reported but not followed
+                if not request.recursive:
+                    return matches, []
+                subdirs = []
+                for entry in dirs:
+                    if entry.is_symlink():
+                        continue
+                    try:
+                        stat_result = entry.stat(follow_symlinks=False)
+                        subdirs.append((entry.path, (stat_result.st_dev, stat_result.st_ino)))
+                    except OSError:
+                        subdirs.append((entry.path, None))
+                return matches, subdirs
+            
+            def thread_search():
+                """
+                Walk the tree and return the requested page of matches (plus one
+                more to detect further results) along with the match count. The
+                walk stops once that extra match is found, so when more results
+                exist the count is a lower bound.
+                """
+                page = []
+                total = 0
+                page_end = offset + limit + 1
+                
+                # Directories are listed concurrently in the search pool, at most
+                # SEARCH_WALK_CONCURRENCY at a time, so stat latency on slow
+                # mounts overlaps instead of adding up
+                root = str(base_path)
+                scanned = {}
+                queued = deque([root])
+                pending = {}
+                # Directories still to be consumed, in os.walk's top-down order
+                order = [root]
+                # Directories reachable through more than one path (bind mounts)
+                # are walked once, keyed on device and inode
+                visited = {(base_stat.st_dev, base_stat.st_ino)}
+                try:
+                    while (queued or pending) and total < page_end and not cancelled.is_set():
+                        while queued and len(pending) < SEARCH_WALK_CONCURRENCY:
+                            dir_path = queued.popleft()
+                            pending[SEARCH_THREAD_POOL.submit(scan_directory, dir_path)] = dir_path
+                        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            dir_path = pending.pop(future)
+                            dir_matches, subdirs = future.result()
+                            unvisited = []
+                            for subdir, key in subdirs:
+                                if key is None or key not in visited:
+                                    visited.add(key)
+                                    unvisited.append(subdir)
+                            scanned[dir_path] = (dir_matches, unvisited)
+                            queued.extend(unvisited)
+                            
+                        # Consume matches in top-down order as soon as every directory
+                        # ahead of them is done; only the page is kept, the rest counted
+                        while order and order[-1] in scanned and total < page_end:
+                            dir_matches, subdirs = scanned.pop(order.pop())
+                            if total < page_end and total + len(dir_matches) > offset:
+                                page.extend(dir_matches[max(offset - total, 0):page_end - total])
+                            total += len(dir_matches)
+                            order.extend(reversed(subdirs))
                 except Exception as e:
                     logger.error(f"Error in file system search: {e}")
                 finally:
-                    scan_complete = True
-            
-            # Start the search in a thread
-            future = THREAD_POOL.submit(thread_search)
+                    for future in pending:
+                        future.cancel()
+                        
+                # Only the returned matches get their timestamps formatted
+                for match in page:
+                    match["modified_time"] = format_utc_timestamp(match["modified_time"])
+                        
+                return page, total
             
             # Wait for results with timeout
             try:
                 max_time = min(request.timeout_seconds, 60)  # Cap at 60 seconds max
-                await asyncio.sleep(0.1)  # Short pause to allow immediate results
-                
-                start_wait = time.time()
-                while not scan_complete and time.time() - start_wait < max_time:
-                    await asyncio.sleep(0.1)
-                    
-                # Apply pagination to results
-                offset = request.pagination.get("offset", 0)
-                limit = request.pagination.get("limit", 100)
-                
-                # Get subset of results
-                end_idx = offset + limit + 1  # +1 to check if more results
-                if end_idx > len(all_matches):
-                    end_idx = len(all_matches)
+                async with search_slots:
+                    # Start the search in a thread. The wrapped future is resolved from
+                    # the worker through call_soon_threadsafe, so awaiting it wakes the
+                    # loop once, when the walk finishes, rather than polling
+                    future = asyncio.wrap_future(THREAD_POOL.submit(thread_search))
+                    try:
+                        result_subset, total_count = await asyncio.wait_for(asyncio.shield(future), max_time)
+                    except asyncio.TimeoutError:
+                        # Stop the walk and return what was found so far
+                        cancelled.set()
+                        result_subset, total_count = await future
                     
-                result_subset = all_matches[offset:end_idx]
-                
                 # Check if there are more results
                 has_more = len(result_subset) > limit
                 if has_more:
                     result_subset = result_subset[:-1]  # Remove the extra item
                     
-                return SearchResponse(
+                response = SearchResponse(
                     items=result_subset,
                     total=total_count,
                     has_more=has_more,
                     execution_time_seconds=time.time() - start_time
                 )
+                # Results cut short by the timeout aren't worth replaying
+                if use_response_cache and not cancelled.is_set():
+                    add_cached_response(cache_key, base_stat.st_mtime_ns, response)
+                return response
                 
             except Exception as e:
                 raise HTTPException(
@@ -2662,6 +3512,82 @@ async def search_files(request: SearchRequest = Body(...)):
             detail=f"Search error: {str(e)}"
         )
 
+@app.post(
+    "/search_files_with_hash",
+    response_model=SearchResponse,
+    summary="Search for files with content hashes",
+    description="""
+    Search for files like /search_files and add the SHA-256 of each matching
+    file's content as a hex string under "sha256" (null if the file can't be read).
+    
+    Hashes are cached in the metadata database keyed by the file's resolved path
+    and reused while its size and modification time are unchanged, so only new
+    or modified files are read.
+    """
+)
+async def search_files_with_hash(request: SearchRequest = Body(...)):
+    """
+    Search for files and add the SHA-256 of each matching file's content.
+    Cached hashes are reused while the file's size and mtime_ns match.
+    """
+    start_time = time.time()
+    # Bypass the response cache, so the hashed listing can't predate a change
+    response = await _search_files(request, use_response_cache=False)
+    
+    try:
+        file_paths = [item["path"] for item in response.items if item["type"] == "file"]
+        identities = await run_in_threadpool(file_identities, file_paths)
+        
+        cached_hashes = {}
+        if METADATA_API_AVAILABLE:
+            cached_hashes = await db.get_file_hashes(
+                sorted({real_path for real_path, _, _ in identities.values()})
+            )
+            
+        digests = {}
+        stale = {}
+        for real_path, size, mtime_ns in identities.values():
+            cached = cached_hashes.get(real_path)
+            if cached is not None and cached[0] == size and cached[1] == mtime_ns:
+                digests[real_path] = cached[2]
+            else:
+                stale[real_path] = (size, mtime_ns)
+                
+        # Hash new and changed files in parallel; hashlib releases the GIL while hashing
+        loop = asyncio.get_running_loop()
+        hashed = await asyncio.gather(*(
+            loop.run_in_executor(SEARCH_THREAD_POOL, file_sha256, real_path)
+            for real_path in stale
+        ))
+        new_hashes = {}
+        for (real_path, (size, mtime_ns)), digest in zip(stale.items(), hashed):
+            if digest is not None:
+                digests[real_path] = digest
+                new_hashes[real_path] = (size, mtime_ns, digest)
+                
+        if METADATA_API_AVAILABLE and new_hashes:
+            await db.store_file_hashes(new_hashes)
+            
+        # Add the hashes to copies of the file items
+        items = []
+        for item in response.items:
+            if item["type"] == "file":
+                identity = identities.get(item["path"])
+                digest = digests.get(identity[0]) if identity else None
+                item = {**item, "sha256": digest}
+            items.append(item)
+            
+        return response.model_copy(update={
+            "items": items,
+            "execution_time_seconds": time.time() - start_time
+        })
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error hashing search results: {str(e)}"
+        )
+
 # -----------------------------------------------------------------------
 # Database Query API - For direct database interaction
 # -----------------------------------------------------------------------
@@ -2769,16 +3695,14 @@ async def database_query(request: DatabaseQueryRequest = Body(...)):
             detail="Only SELECT queries are allowed for security reasons"
         )
         
-    # Check for dangerous keywords that might bypass our security
-    dangerous_keywords = ["insert", "update", "delete", "drop", "alter", "create", 
-                         "pragma", "attach", "detach", "vacuum", ";"]
-    
-    for keyword in dangerous_keywords:
-        if keyword.lower() in query.lower():
-            raise HTTPException(
-                status_code=403,
-                detail=f"Query contains disallowed keyword: {keyword}"
-            )
+    # Check for dangerous keywords that might bypass our security. Whole words
+    # only, so columns like created_time don't trip the check
+    match = db.DISALLOWED_QUERY_KEYWORDS.search(query)
+    if match:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Query contains disallowed keyword: {match.group(0).lower()}"
+        )
     
     # Add LIMIT clause if not present
     if "limit " not in query.lower():
@@ -2787,57 +3711,40 @@ async def database_query(request: DatabaseQueryRequest = Body(...)):
         query = f"{query} LIMIT {request.limit}"
     else:
         # If LIMIT is already present, ensure it doesn't exceed our max
-        limit_pattern = re.compile(r'limit\s+(\d+)', re.IGNORECASE)
-        match = limit_pattern.search(query)
+        match = db.QUERY_LIMIT_PATTERN.search(query)
         if match:
             try:
                 limit_value = int(match.group(1))
                 if limit_value > request.limit:
                     # Replace with our limit
-                    query = limit_pattern.sub(f"LIMIT {request.limit}", query)
+                    query = db.QUERY_LIMIT_PATTERN.sub(f"LIMIT {request.limit}", query)
             except ValueError:
                 pass
     
     try:
         start_time = time.time()
         
-        # Use SQLite's built-in connection for simplicity
-        import sqlite3
-        import json
-        
-        # Get the database path from our module
-        db_path = db.DB_PATH
-        
-        # Connect to the database directly
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # This allows us to access columns by name
-        
-        # Execute the query
-        cursor = conn.cursor()
-        if request.params:
-            cursor.execute(query, request.params)
-        else:
-            cursor.execute(query)
-        
-        # Get the results
-        rows = []
-        for row in cursor.fetchall():
-            # Convert sqlite3.Row to dict
-            row_dict = {key: row[key] for key in row.keys()}
-            rows.append(row_dict)
-        
-        # Close the connection
-        conn.close()
+        # Execute the query on a pooled read-only connection, off the event loop
+        rows = await db.run_read_only_query(query, request.params)
         
         execution_time = time.time() - start_time
         
-        return {
+        result = {
             "status": "success",
             "rows": rows,
             "row_count": len(rows),
             "execution_time_ms": int(execution_time * 1000),
             "query": query
         }
+        # Large result sets serialize much faster through orjson, and returning
+        # the response directly skips FastAPI's per-value jsonable_encoder pass.
+        # Either way BLOB values come back as hex strings
+        if ORJSON_AVAILABLE:
+            return Response(
+                content=orjson.dumps(result, default=db.encode_query_value),
+                media_type="application/json"
+            )
+        return jsonable_encoder(result, custom_encoder={bytes: db.encode_query_value})
     except sqlite3.Error as e:
         raise HTTPException(
             status_code=500,
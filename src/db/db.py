@@ -2,14 +2,22 @@
 Database module for file metadata indexing.
 Provides SQLAlchemy models and async database operations.
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, func, select
+from sqlalchemy import Column, String, Integer, Float, Boolean, Text, DateTime, Index, Computed, TypeDecorator, bindparam, case, event, func, select, delete, update, or_, and_, literal, text, table, column, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import deferred
 import os
 import pathlib
 from datetime import datetime
 import asyncio
-from typing import List, Dict, Any, Optional, Union
+import contextlib
+import functools
+import queue
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
 
 # Import ignore pattern matching functionality
@@ -31,9 +39,31 @@ DB_URL = f"sqlite+aiosqlite:///{DB_PATH}"
 engine = create_async_engine(
     DB_URL, 
     echo=False,  # Set to True for SQL debugging
-    future=True
+    future=True,
+    # Room for every cached search_metadata/search_metadata_count statement
+    # alongside the ORM's own statements (default 500)
+    query_cache_size=1200
 )
 
+# Applied to every connection the engine opens. WAL lets the read-only pool
+# query while the indexer writes, and with synchronous=NORMAL a commit no longer
+# waits for an fsync (the WAL is synced at checkpoints instead)
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MB
+    "PRAGMA mmap_size = 10737418240",  # 10 GB, capped by SQLite's compile-time limit
+    "PRAGMA busy_timeout = 5000",  # ms
+)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_connection_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in CONNECTION_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 # Create async session factory
 async_session = async_sessionmaker(
     engine, 
@@ -44,6 +74,97 @@ async_session = async_sessionmaker(
 # Declarative base for models
 Base = declarative_base()
 
+# Read-only sqlite3 connections for the database_query endpoints, reused across
+# requests instead of connecting (and re-reading the schema) every time. At most
+# READ_ONLY_POOL_SIZE idle connections are kept; extra ones are closed after use
+READ_ONLY_POOL_SIZE = 4
+READ_ONLY_PRAGMAS = (
+    "PRAGMA query_only = 1",
+    "PRAGMA mmap_size = 268435456",  # 256 MB: page reads come straight from the page cache
+    "PRAGMA cache_size = -16384",  # 16 MB per connection
+    "PRAGMA temp_store = MEMORY",
+)
+read_only_pool: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+
+def _open_read_only_connection() -> sqlite3.Connection:
+    """Open a read-only connection to the metadata database, usable from any thread."""
+    conn = sqlite3.connect(
+        f"{pathlib.Path(DB_PATH).as_uri()}?mode=ro", uri=True, check_same_thread=False
+    )
+    for pragma in READ_ONLY_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+@contextlib.contextmanager
+def read_only_connection():
+    """Borrow a pooled read-only sqlite3 connection for one query."""
+    try:
+        conn = read_only_pool.get_nowait()
+    except queue.Empty:
+        conn = _open_read_only_connection()
+    try:
+        yield conn
+    finally:
+        if read_only_pool.qsize() < READ_ONLY_POOL_SIZE:
+            read_only_pool.put(conn)
+        else:
+            conn.close()
+
+# Read-only queries run in their own small pool (one thread per pooled
+# connection), so a slow query blocks neither the event loop nor the file pools
+READ_ONLY_EXECUTOR = ThreadPoolExecutor(max_workers=READ_ONLY_POOL_SIZE, thread_name_prefix="sqlite")
+
+def _run_read_only_query(query: str, params: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with read_only_connection() as conn:
+        cursor = conn.execute(query, params or ())
+        # Pair plain row tuples with the column names in C (dict(zip))
+        # rather than key by key through sqlite3.Row
+        columns = [description[0] for description in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        cursor.close()
+    return rows
+
+async def run_read_only_query(query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Run a SELECT on a pooled read-only connection in READ_ONLY_EXECUTOR.
+    
+    Args:
+        query: SQL query to execute
+        params: Optional named parameters for the query
+        
+    Returns:
+        List of rows as column name to value dictionaries
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        READ_ONLY_EXECUTOR, _run_read_only_query, query, params
+    )
+
+# The database_query endpoints accept single SELECT statements only: these
+# keywords (as whole words) and statement separators are rejected
+DISALLOWED_QUERY_KEYWORDS = re.compile(
+    r'\b(?:insert|update|delete|drop|alter|create|pragma|attach|detach|vacuum)\b|;',
+    re.IGNORECASE
+)
+# Existing LIMIT clause in a database_query query, capped at the request's limit
+QUERY_LIMIT_PATTERN = re.compile(r'limit\s+(\d+)', re.IGNORECASE)
+
+def encode_query_value(value: Any) -> str:
+    """
+    JSON form of database_query values JSON has no type for: BLOBs are
+    reported as hex strings. Usable as orjson's default= hook.
+    """
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def close_read_only_connections():
+    """Close the idle pooled read-only connections."""
+    while True:
+        try:
+            read_only_pool.get_nowait().close()
+        except queue.Empty:
+            return
+
 class FileMetadata(Base):
     """
     SQLAlchemy model for file metadata.
@@ -53,7 +174,7 @@ class FileMetadata(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     path = Column(String(1024), unique=True, index=True, nullable=False)
-    parent_dir = Column(String(1024), index=True, nullable=False)
+    parent_dir = Column(String(1024), nullable=False)
     name = Column(String(255), index=True, nullable=False)
     extension = Column(String(50), index=True)
     is_directory = Column(Boolean, index=True, default=False)
@@ -61,10 +182,14 @@ class FileMetadata(Base):
     created_time = Column(DateTime, default=datetime.utcnow)
     modified_time = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_indexed = Column(DateTime, default=datetime.utcnow)
-    # Content summary for text files (optional)
-    content_summary = Column(Text, nullable=True)
+    # Content summary for text files (optional). Deferred: loading a
+    # FileMetadata doesn't read it unless the attribute is asked for
+    content_summary = deferred(Column(Text, nullable=True))
     # Additional metadata as needed
     mime_type = Column(String(100))
+    # Number of '/' in path, computed by SQLite (a virtual generated column,
+    # so writers never set it)
+    depth = Column(Integer, Computed("length(path) - length(replace(path, '/', ''))", persisted=False))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the model to a dictionary."""
@@ -81,10 +206,134 @@ class FileMetadata(Base):
             "mime_type": self.mime_type
         }
 
+class ISODateTime(TypeDecorator):
+    """DateTime that reads back as an ISO 8601 string, as FileMetadata.to_dict reports it."""
+    impl = DateTime
+    cache_ok = True
+    
+    def process_result_value(self, value, dialect):
+        return value.isoformat() if value else None
+
+# Columns reported by FileMetadata.to_dict, in the same order and with the
+# timestamps already ISO formatted; search_metadata selects these directly
+# instead of loading whole rows into ORM objects
+METADATA_DICT_COLUMNS = (
+    FileMetadata.id,
+    FileMetadata.path,
+    FileMetadata.name,
+    FileMetadata.extension,
+    FileMetadata.is_directory,
+    FileMetadata.size_bytes,
+    type_coerce(FileMetadata.created_time, ISODateTime).label("created_time"),
+    type_coerce(FileMetadata.modified_time, ISODateTime).label("modified_time"),
+    type_coerce(FileMetadata.last_indexed, ISODateTime).label("last_indexed"),
+    FileMetadata.mime_type,
+)
+
+# Lookup of one entry by path, built once and executed with a bound path
+METADATA_BY_PATH = select(FileMetadata).where(FileMetadata.path == bindparam("path"))
+
+# Composite and range indexes for the common search_metadata filters. The
+# (parent_dir, name) index also serves parent_dir lookups on its own, so
+# parent_dir has no single-column index
+FILE_METADATA_INDEXES = (
+    Index("ix_parent_name", FileMetadata.parent_dir, FileMetadata.name),
+    Index("ix_modified_time", FileMetadata.modified_time),
+    Index("ix_isdir_size", FileMetadata.is_directory, FileMetadata.size_bytes),
+    # Depth-limited subtree searches: one path range per depth level
+    Index("ix_depth_path", FileMetadata.depth, FileMetadata.path),
+)
+
+class FileHash(Base):
+    """
+    SQLAlchemy model for cached file content hashes.
+    A hash is reused while the file's size and mtime_ns still match the stored ones.
+    """
+    __tablename__ = "file_hashes"
+    
+    path = Column(String(1024), primary_key=True)
+    size_bytes = Column(Integer, nullable=False)
+    mtime_ns = Column(Integer, nullable=False)
+    # Hex digest, readable as is through the database_query endpoints
+    sha256 = Column(String(64), nullable=False)
+
+# Paths per IN (...) lookup when reading the hash cache, well under SQLite's
+# bound parameter limit
+FILE_HASH_LOOKUP_BATCH = 500
+
+# Trigram FTS5 index over file names, kept in sync with file_metadata by
+# triggers. Substring (LIKE '%q%') name searches are answered from the index
+# instead of scanning the table; NAME_FTS_AVAILABLE is False when the SQLite
+# build lacks FTS5, and searches fall back to LIKE on the table
+NAME_FTS_AVAILABLE = False
+name_fts = table("file_metadata_fts", column("rowid"), column("name"))
+
+NAME_FTS_DDL = [
+    """CREATE VIRTUAL TABLE file_metadata_fts USING fts5(
+        name, content='file_metadata', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER file_metadata_fts_insert AFTER INSERT ON file_metadata BEGIN
+        INSERT INTO file_metadata_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    """CREATE TRIGGER file_metadata_fts_delete AFTER DELETE ON file_metadata BEGIN
+        INSERT INTO file_metadata_fts(file_metadata_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END""",
+    """CREATE TRIGGER file_metadata_fts_update AFTER UPDATE OF name ON file_metadata BEGIN
+        INSERT INTO file_metadata_fts(file_metadata_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO file_metadata_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    # Index the rows that existed before the table was created
+    "INSERT INTO file_metadata_fts(file_metadata_fts) VALUES ('rebuild')",
+]
+
+async def create_name_fts(conn) -> bool:
+    """Create the file name FTS index if it doesn't exist. Returns whether it is usable."""
+    result = await conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_metadata_fts'"
+    ))
+    if result.first() is not None:
+        return True
+    try:
+        for statement in NAME_FTS_DDL:
+            await conn.execute(text(statement))
+    except Exception as e:
+        logger.warning(f"File name FTS index unavailable, name searches will scan the table: {e}")
+        return False
+    return True
+
 async def create_tables():
     """Create database tables if they don't exist."""
+    global NAME_FTS_AVAILABLE
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all doesn't add columns to existing tables
+        result = await conn.exec_driver_sql("SELECT 1 FROM pragma_table_xinfo('file_metadata') WHERE name = 'depth'")
+        if result.first() is None:
+            await conn.exec_driver_sql(
+                "ALTER TABLE file_metadata ADD COLUMN depth INTEGER "
+                "GENERATED ALWAYS AS (length(path) - length(replace(path, '/', ''))) VIRTUAL"
+            )
+        # create_all only indexes new tables; bring databases created before
+        # FILE_METADATA_INDEXES up to date
+        result = await conn.exec_driver_sql("SELECT name FROM sqlite_master")
+        existing = {row[0] for row in result}
+        created = [index for index in FILE_METADATA_INDEXES if index.name not in existing]
+        for index in created:
+            await conn.run_sync(index.create, checkfirst=True)
+        await conn.exec_driver_sql("DROP INDEX IF EXISTS ix_file_metadata_parent_dir")
+        # Hashes cached before they were stored as hex digests
+        await conn.exec_driver_sql(
+            "UPDATE file_hashes SET sha256 = lower(hex(sha256)) WHERE typeof(sha256) = 'blob'"
+        )
+        # Give the planner statistics to pick between the indexes. A full ANALYZE
+        # reads every index, so it only runs when there are none yet or an index
+        # was just added; otherwise optimize refreshes them only if they're stale
+        if created or "sqlite_stat1" not in existing:
+            await conn.exec_driver_sql("ANALYZE")
+        else:
+            await conn.exec_driver_sql("PRAGMA optimize")
+    async with engine.begin() as conn:
+        NAME_FTS_AVAILABLE = await create_name_fts(conn)
     logger.info("Database tables created.")
 
 async def get_db_session():
@@ -95,30 +344,41 @@ async def get_db_session():
     finally:
         await session.close()
 
-# File Metadata Operations
+# Simple MIME type detection based on extension, for files only
+EXTENSION_MIME_TYPES = {
+    '.txt': 'text/plain',
+    '.pdf': 'application/pdf',
+    '.py': 'text/x-python',
+    '.js': 'application/javascript',
+    '.html': 'text/html',
+    '.css': 'text/css',
+    '.json': 'application/json',
+    '.xml': 'application/xml',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.md': 'text/markdown'
+}
+DEFAULT_MIME_TYPE = 'application/octet-stream'
 
-async def index_file(file_path: Union[str, pathlib.Path], session: Optional[AsyncSession] = None) -> FileMetadata:
+# Columns refreshed when an already indexed path is indexed again; path,
+# name, extension, is_directory and created_time keep their first values
+UPSERT_UPDATED_COLUMNS = ("modified_time", "size_bytes", "last_indexed", "mime_type")
+
+# Rows written per bulk upsert (and transaction) by index_directory_recursive
+INDEX_BATCH_SIZE = 1000
+
+def build_metadata_row(file_path: pathlib.Path) -> Dict[str, Any]:
     """
-    Index a file or directory by adding or updating its metadata in the database.
-    Respects ignore patterns if available.
+    Stat a file or directory and build its file_metadata column values.
     
     Args:
-        file_path: Path to the file or directory to index
-        session: Optional database session (creates one if not provided)
+        file_path: Path to the file or directory
         
     Returns:
-        The FileMetadata object
+        Dictionary of FileMetadata column values
     """
-    if isinstance(file_path, str):
-        file_path = pathlib.Path(file_path)
-    
-    # Check if the file should be ignored based on ignore patterns
-    if IGNORE_PATTERNS_AVAILABLE and ignore_patterns.should_ignore(file_path):
-        logger.debug(f"Skipping ignored path: {file_path}")
-        raise ValueError(f"Path ignored due to ignore patterns: {file_path}")
-    
-    logger.debug(f"Indexing path: {file_path}")
-    
     # Get file stats
     try:
         if not file_path.exists():
@@ -138,98 +398,176 @@ async def index_file(file_path: Union[str, pathlib.Path], session: Optional[Asyn
     # Get file details
     try:
         stat_result = file_path.stat()
-        size_bytes = None if is_directory else stat_result.st_size
-        
-        # Get timestamps
-        modified_time = datetime.fromtimestamp(stat_result.st_mtime)
-        try:
-            created_time = datetime.fromtimestamp(stat_result.st_birthtime)
-        except AttributeError:
-            created_time = datetime.fromtimestamp(stat_result.st_ctime)
     except (PermissionError, OSError) as e:
         logger.warning(f"Error getting file stats: {file_path}: {e}")
         raise
     
-    # Get MIME type for files
+    return metadata_row(str(file_path), str(file_path.parent), file_path.name, is_directory, stat_result)
+
+def extension_and_mime_type(name: str) -> Tuple[str, str]:
+    """Lowercased extension and MIME type recorded for a file with this name."""
+    # Same rule as pathlib's suffix: the last dot, unless it starts or ends the name
+    dot = name.rfind('.')
+    extension = name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+    return extension, EXTENSION_MIME_TYPES.get(extension, DEFAULT_MIME_TYPE)
+
+def metadata_row(path_str: str, parent_dir: str, name: str, is_directory: bool,
+                 stat_result: os.stat_result, last_indexed: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Build the file_metadata column values for a path from its stat result.
+    
+    Args:
+        path_str: Path of the file or directory
+        parent_dir: Path of its parent directory
+        name: Final path component
+        is_directory: Whether the path is a directory
+        stat_result: stat() of the path, following symlinks
+        last_indexed: Indexing time to record (default: now)
+        
+    Returns:
+        Dictionary of FileMetadata column values
+    """
+    size_bytes = None if is_directory else stat_result.st_size
+    
+    # Get timestamps
+    modified_time = datetime.fromtimestamp(stat_result.st_mtime)
+    try:
+        created_time = datetime.fromtimestamp(stat_result.st_birthtime)
+    except AttributeError:
+        created_time = datetime.fromtimestamp(stat_result.st_ctime)
+    
+    # Get extension and MIME type for files
+    extension = None
     mime_type = None
     if not is_directory:
-        # Simple MIME type detection based on extension
-        extension_map = {
-            '.txt': 'text/plain',
-            '.pdf': 'application/pdf',
-            '.py': 'text/x-python',
-            '.js': 'application/javascript',
-            '.html': 'text/html',
-            '.css': 'text/css',
-            '.json': 'application/json',
-            '.xml': 'application/xml',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.md': 'text/markdown'
-        }
-        extension = file_path.suffix.lower()
-        mime_type = extension_map.get(extension, 'application/octet-stream')
+        extension, mime_type = extension_and_mime_type(name)
     
-    # Create a FileMetadata object
-    close_session = False
-    if session is None:
-        session = async_session()
-        close_session = True
+    return {
+        "path": path_str,
+        "parent_dir": parent_dir,
+        "name": name,
+        "extension": extension,
+        "is_directory": is_directory,
+        "size_bytes": size_bytes,
+        "created_time": created_time,
+        "modified_time": modified_time,
+        "last_indexed": last_indexed or datetime.utcnow(),
+        "mime_type": mime_type,
+    }
+
+# Column order of metadata_row dicts, and the upsert run for them directly on
+# the driver connection
+METADATA_ROW_COLUMNS = (
+    "path", "parent_dir", "name", "extension", "is_directory", "size_bytes",
+    "created_time", "modified_time", "last_indexed", "mime_type",
+)
+METADATA_UPSERT_SQL = (
+    f"INSERT INTO file_metadata ({', '.join(METADATA_ROW_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(METADATA_ROW_COLUMNS))}) "
+    f"ON CONFLICT(path) DO UPDATE SET "
+    + ", ".join(f"{column_name} = excluded.{column_name}" for column_name in UPSERT_UPDATED_COLUMNS)
+)
+
+def _sqlite_datetime(value: Optional[datetime]) -> Optional[str]:
+    """Format a datetime the way SQLAlchemy's SQLite DateTime type stores it."""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value is not None else None
+
+async def upsert_metadata_rows(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert or update a batch of metadata_row rows with one executemany and
+    commit the session. Rows for paths already indexed refresh UPSERT_UPDATED_COLUMNS.
     
+    The statement goes straight to the aiosqlite connection underneath the
+    session, skipping the ORM's per-row bulk insert handling. ON CONFLICT DO
+    UPDATE keeps the row id, so the name FTS triggers see an ordinary update
+    (INSERT OR REPLACE would delete the row without firing them).
+    """
+    if rows:
+        params = [
+            (
+                row["path"], row["parent_dir"], row["name"], row["extension"],
+                row["is_directory"], row["size_bytes"],
+                _sqlite_datetime(row["created_time"]), _sqlite_datetime(row["modified_time"]),
+                _sqlite_datetime(row["last_indexed"]), row["mime_type"],
+            )
+            for row in rows
+        ]
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.executemany(METADATA_UPSERT_SQL, params)
+    await session.commit()
+
+# File Metadata Operations
+
+async def _index_file_in_session(session: AsyncSession, file_path: pathlib.Path) -> FileMetadata:
+    """
+    Add or update the metadata of one path in an open session without committing,
+    so callers indexing many paths can commit them together.
+    Respects ignore patterns if available.
+    """
+    # Check if the file should be ignored based on ignore patterns
+    if IGNORE_PATTERNS_AVAILABLE and ignore_patterns.should_ignore(file_path):
+        logger.debug("Skipping ignored path: %s", file_path)
+        raise ValueError(f"Path ignored due to ignore patterns: {file_path}")
+    
+    logger.debug("Indexing path: %s", file_path)
+    row = build_metadata_row(file_path)
+    
+    # Check if file already exists in database
     try:
-        # Check if file already exists in database
+        result = await session.execute(METADATA_BY_PATH, {"path": str(file_path)})
+        metadata = result.scalar_one_or_none()
+    except Exception as e:
+        logger.error(f"Database query error for {file_path}: {e}")
+        raise
+    
+    # If not exists, create new entry
+    if metadata is None:
         try:
-            query = select(FileMetadata).where(FileMetadata.path == str(file_path))
-            result = await session.execute(query)
-            metadata = result.scalar_one_or_none()
+            metadata = FileMetadata(**row)
+            session.add(metadata)
+            logger.debug("Added new metadata for %s", file_path)
         except Exception as e:
-            logger.error(f"Database query error for {file_path}: {e}")
+            logger.error(f"Error creating metadata for {file_path}: {e}")
             raise
-        
-        # If not exists, create new entry
-        if metadata is None:
-            try:
-                metadata = FileMetadata(
-                    path=str(file_path),
-                    parent_dir=str(file_path.parent),
-                    name=file_path.name,
-                    extension=file_path.suffix.lower() if not is_directory else None,
-                    is_directory=is_directory,
-                    size_bytes=size_bytes,
-                    created_time=created_time,
-                    modified_time=modified_time,
-                    last_indexed=datetime.utcnow(),
-                    mime_type=mime_type
-                )
-                session.add(metadata)
-                logger.debug(f"Added new metadata for {file_path}")
-            except Exception as e:
-                logger.error(f"Error creating metadata for {file_path}: {e}")
-                raise
-        else:
-            # Update existing entry
-            try:
-                metadata.modified_time = modified_time
-                metadata.size_bytes = size_bytes
-                metadata.last_indexed = datetime.utcnow()
-                metadata.mime_type = mime_type
-                logger.debug(f"Updated metadata for {file_path}")
-            except Exception as e:
-                logger.error(f"Error updating metadata for {file_path}: {e}")
-                raise
-        
+    else:
+        # Update existing entry
         try:
-            await session.commit()
-            return metadata
+            for column_name in UPSERT_UPDATED_COLUMNS:
+                setattr(metadata, column_name, row[column_name])
+            logger.debug("Updated metadata for %s", file_path)
         except Exception as e:
-            logger.error(f"Error committing metadata for {file_path}: {e}")
-            await session.rollback()
+            logger.error(f"Error updating metadata for {file_path}: {e}")
             raise
-    finally:
-        if close_session:
-            await session.close()
+    return metadata
+
+async def index_file(file_path: Union[str, pathlib.Path], session: Optional[AsyncSession] = None) -> FileMetadata:
+    """
+    Index a file or directory by adding or updating its metadata in the database.
+    Respects ignore patterns if available.
+    
+    Args:
+        file_path: Path to the file or directory to index
+        session: Optional database session (creates one if not provided)
+        
+    Returns:
+        The FileMetadata object
+    """
+    if isinstance(file_path, str):
+        file_path = pathlib.Path(file_path)
+    
+    if session is None:
+        async with async_session() as session:
+            return await index_file(file_path, session)
+    
+    metadata = await _index_file_in_session(session, file_path)
+    try:
+        await session.commit()
+        return metadata
+    except Exception as e:
+        logger.error(f"Error committing metadata for {file_path}: {e}")
+        await session.rollback()
+        raise
 
 async def delete_metadata(file_path: Union[str, pathlib.Path], session: Optional[AsyncSession] = None) -> bool:
     """
@@ -251,37 +589,279 @@ async def delete_metadata(file_path: Union[str, pathlib.Path], session: Optional
         close_session = True
         
     try:
-        # Find the metadata entry
-        query = select(FileMetadata).where(FileMetadata.path == str(file_path))
-        result = await session.execute(query)
-        metadata = result.scalar_one_or_none()
-        
-        if metadata is None:
-            return False
-            
         # Delete the entry
-        await session.delete(metadata)
-        await session.commit()
+        path_str = str(file_path)
+        result = await session.execute(
+            delete(FileMetadata)
+            .where(FileMetadata.path == path_str)
+            .returning(FileMetadata.is_directory)
+        )
+        is_directory = result.scalar_one_or_none()
         
-        # If it's a directory, also delete all children
-        if metadata.is_directory:
-            # Find all entries with paths starting with this directory
-            path_prefix = f"{metadata.path}/"
-            query = select(FileMetadata).where(FileMetadata.path.startswith(path_prefix))
-            result = await session.execute(query)
-            children = result.scalars().all()
-            
-            # Delete all children
-            for child in children:
-                await session.delete(child)
-            
+        # Cached content hashes of the path (and anything under it) go with it
+        await session.execute(
+            delete(FileHash).where(_path_or_descendants(FileHash.path, path_str))
+        )
+        
+        if is_directory is None:
             await session.commit()
+            return False
             
+        # If it's a directory, also delete all children in one statement (a path
+        # range the unique path index can answer, unlike LIKE 'prefix%')
+        if is_directory:
+            await session.execute(
+                delete(FileMetadata).where(
+                    FileMetadata.path >= f"{path_str}/", FileMetadata.path < f"{path_str}0"
+                )
+            )
+            
+        await session.commit()
         return True
     finally:
         if close_session:
             await session.close()
 
+def _path_or_descendants(column, path_str: str):
+    """
+    Filter matching path_str itself or any path under it. Uses a range comparison
+    (like the bisect range in the file cache) instead of LIKE, which would treat
+    '_' and '%' in paths as wildcards and compare case-insensitively.
+    """
+    return or_(
+        column == path_str,
+        and_(column >= f"{path_str}/", column < f"{path_str}0")
+    )
+
+async def delete_metadata_prefix(file_path: Union[str, pathlib.Path], session: Optional[AsyncSession] = None) -> int:
+    """
+    Delete metadata for a path and everything under it in a single statement.
+    
+    Args:
+        file_path: Path of the file or directory whose metadata should be removed
+        session: Optional database session (creates one if not provided)
+        
+    Returns:
+        Number of entries deleted
+    """
+    path_str = str(file_path)
+    
+    close_session = False
+    if session is None:
+        session = async_session()
+        close_session = True
+        
+    try:
+        result = await session.execute(
+            delete(FileMetadata).where(_path_or_descendants(FileMetadata.path, path_str))
+        )
+        await session.execute(
+            delete(FileHash).where(_path_or_descendants(FileHash.path, path_str))
+        )
+        await session.commit()
+        return result.rowcount
+    finally:
+        if close_session:
+            await session.close()
+
+async def move_metadata_prefix(source: Union[str, pathlib.Path], destination: Union[str, pathlib.Path],
+                               session: Optional[AsyncSession] = None) -> int:
+    """
+    Rewrite metadata paths after a file or directory move, updating the moved
+    entry and everything under it with bulk UPDATE statements.
+    
+    Args:
+        source: Path the file or directory was moved from
+        destination: Path it was moved to
+        session: Optional database session (creates one if not provided)
+        
+    Returns:
+        Number of entries moved
+    """
+    src = str(source)
+    dst = str(destination)
+    
+    close_session = False
+    if session is None:
+        session = async_session()
+        close_session = True
+        
+    try:
+        # Anything previously indexed at the destination was replaced by the move
+        # (and would collide with the unique path column)
+        await session.execute(
+            delete(FileMetadata).where(_path_or_descendants(FileMetadata.path, dst))
+        )
+        # Cached hashes under either path are dropped rather than rewritten;
+        # moved files are simply hashed again at their new path
+        for path_str in (src, dst):
+            await session.execute(
+                delete(FileHash).where(_path_or_descendants(FileHash.path, path_str))
+            )
+        
+        # The moved entry itself. A rename can change a file's extension, so
+        # refresh it and the MIME type as metadata_row would (directories have neither)
+        name = os.path.basename(dst)
+        extension, mime_type = extension_and_mime_type(name)
+        result = await session.execute(
+            update(FileMetadata)
+            .where(FileMetadata.path == src)
+            .values(
+                path=dst, parent_dir=os.path.dirname(dst), name=name,
+                extension=case((FileMetadata.is_directory, None), else_=extension),
+                mime_type=case((FileMetadata.is_directory, None), else_=mime_type)
+            )
+        )
+        moved = result.rowcount
+        
+        # Its descendants: swap the source prefix of path and parent_dir for the destination
+        result = await session.execute(
+            update(FileMetadata)
+            .where(FileMetadata.path >= f"{src}/", FileMetadata.path < f"{src}0")
+            .values(
+                path=literal(dst) + func.substr(FileMetadata.path, len(src) + 1),
+                parent_dir=literal(dst) + func.substr(FileMetadata.parent_dir, len(src) + 1)
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        moved += result.rowcount
+        
+        await session.commit()
+        return moved
+    finally:
+        if close_session:
+            await session.close()
+
+@functools.lru_cache(maxsize=512)
+def _metadata_statement(
+    count: bool,
+    use_name_fts: bool,
+    has_query: bool,
+    has_extensions: bool,
+    has_is_directory: bool,
+    has_min_size: bool,
+    has_max_size: bool,
+    has_modified_after: bool,
+    has_modified_before: bool,
+    has_path_prefix: bool,
+    has_max_depth: bool,
+):
+    """
+    Build the search_metadata (or, with count, search_metadata_count) statement
+    for one combination of filters. Filter values are bound parameters (see
+    _metadata_params), so each combination is built once and reused.
+    """
+    filters = []
+    
+    if has_query:
+        if use_name_fts:
+            # Same LIKE match, answered by the trigram index. Queries of three
+            # or more characters only compare names sharing all their trigrams,
+            # so there's no full pass over the names left to speed up
+            filters.append(FileMetadata.id.in_(
+                select(name_fts.c.rowid).where(name_fts.c.name.contains(bindparam("query")))
+            ))
+        else:
+            filters.append(FileMetadata.name.contains(bindparam("query")))
+        
+    if has_extensions:
+        filters.append(FileMetadata.extension.in_(bindparam("extensions", expanding=True)))
+        
+    if has_is_directory:
+        filters.append(FileMetadata.is_directory == bindparam("is_directory"))
+        
+    if has_min_size:
+        filters.append(FileMetadata.size_bytes >= bindparam("min_size"))
+        
+    if has_max_size:
+        filters.append(FileMetadata.size_bytes <= bindparam("max_size"))
+        
+    if has_modified_after:
+        filters.append(FileMetadata.modified_time >= bindparam("modified_after", type_=DateTime))
+        
+    if has_modified_before:
+        filters.append(FileMetadata.modified_time <= bindparam("modified_before", type_=DateTime))
+        
+    if has_path_prefix:
+        # Match exact path or paths that start with path_prefix/, as a range
+        # on the path index (LIKE 'prefix/%' is case-insensitive and scans);
+        # the same test as _path_or_descendants
+        filters.append(or_(
+            FileMetadata.path == bindparam("path_prefix"),
+            and_(FileMetadata.path >= bindparam("path_lower"), FileMetadata.path < bindparam("path_upper"))
+        ))
+        
+    if has_max_depth:
+        # One equality per allowed depth, so ix_depth_path turns the subtree
+        # range into a path range per level
+        filters.append(FileMetadata.depth.in_(bindparam("depths", expanding=True)))
+        
+    if count:
+        return select(func.count()).select_from(FileMetadata).where(*filters)
+        
+    # Select just the to_dict columns (no ORM objects, no content_summary)
+    # and apply pagination
+    return (
+        select(*METADATA_DICT_COLUMNS).where(*filters)
+        .offset(bindparam("offset")).limit(bindparam("limit"))
+    )
+
+def _metadata_params(
+    query: str = None,
+    extensions: List[str] = None,
+    is_directory: bool = None,
+    min_size: int = None,
+    max_size: int = None,
+    modified_after: datetime = None,
+    modified_before: datetime = None,
+    path_prefix: str = None,
+    max_depth: int = None,
+) -> Tuple[Tuple[bool, ...], Dict[str, Any]]:
+    """
+    Work out which filters apply and their bound parameter values.
+    
+    Returns:
+        Tuple of (filter flags for _metadata_statement, parameters)
+    """
+    params = {}
+    if query:
+        params["query"] = query
+    if extensions:
+        # Convert extensions to lowercase
+        params["extensions"] = [ext.lower() if ext.startswith('.') else f'.{ext.lower()}' for ext in extensions]
+    if is_directory is not None:
+        params["is_directory"] = is_directory
+    if min_size is not None:
+        params["min_size"] = min_size
+    if max_size is not None:
+        params["max_size"] = max_size
+    if modified_after:
+        params["modified_after"] = modified_after
+    if modified_before:
+        params["modified_before"] = modified_before
+    if path_prefix:
+        params["path_prefix"] = path_prefix
+        params["path_lower"] = f"{path_prefix}/"
+        params["path_upper"] = f"{path_prefix}0"
+        if max_depth is not None:
+            # Depths of path_prefix itself through max_depth levels below it
+            prefix_depth = path_prefix.count('/')
+            params["depths"] = list(range(prefix_depth, prefix_depth + max_depth + 1))
+        
+    flags = (
+        NAME_FTS_AVAILABLE,
+        "query" in params,
+        "extensions" in params,
+        "is_directory" in params,
+        "min_size" in params,
+        "max_size" in params,
+        "modified_after" in params,
+        "modified_before" in params,
+        "path_prefix" in params,
+        "depths" in params,
+    )
+    return flags, params
+
 async def search_metadata(
     query: str = None,
     extensions: List[str] = None,
@@ -292,7 +872,8 @@ async def search_metadata(
     modified_before: datetime = None,
     path_prefix: str = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    max_depth: int = None
 ) -> List[Dict[str, Any]]:
     """
     Search file metadata based on various criteria.
@@ -308,55 +889,47 @@ async def search_metadata(
         path_prefix: Only include files under this path
         limit: Maximum number of results to return
         offset: Number of results to skip (for pagination)
+        max_depth: With path_prefix, only include entries at most this many levels below it
         
     Returns:
         List of file metadata dictionaries
     """
+    flags, params = _metadata_params(
+        query, extensions, is_directory, min_size, max_size,
+        modified_after, modified_before, path_prefix, max_depth
+    )
+    params["limit"] = limit
+    params["offset"] = offset
+    
     async with async_session() as session:
-        # Start with a base query for all metadata
-        stmt = select(FileMetadata)
-        
-        # Apply filters
-        if query:
-            stmt = stmt.where(FileMetadata.name.contains(query))
-            
-        if extensions:
-            # Convert extensions to lowercase
-            ext_list = [ext.lower() if ext.startswith('.') else f'.{ext.lower()}' for ext in extensions]
-            stmt = stmt.where(FileMetadata.extension.in_(ext_list))
-            
-        if is_directory is not None:
-            stmt = stmt.where(FileMetadata.is_directory == is_directory)
-            
-        if min_size is not None:
-            stmt = stmt.where(FileMetadata.size_bytes >= min_size)
-            
-        if max_size is not None:
-            stmt = stmt.where(FileMetadata.size_bytes <= max_size)
-            
-        if modified_after:
-            stmt = stmt.where(FileMetadata.modified_time >= modified_after)
-            
-        if modified_before:
-            stmt = stmt.where(FileMetadata.modified_time <= modified_before)
-            
-        if path_prefix:
-            # Match exact path or paths that start with path_prefix/
-            path_with_slash = f"{path_prefix}/"
-            stmt = stmt.where(
-                (FileMetadata.path == path_prefix) | 
-                (FileMetadata.path.startswith(path_with_slash))
-            )
-            
-        # Apply pagination
-        stmt = stmt.offset(offset).limit(limit)
-        
         # Execute the query
-        result = await session.execute(stmt)
-        metadata_list = result.scalars().all()
+        result = await session.execute(_metadata_statement(False, *flags), params)
         
-        # Convert to dictionaries
-        return [metadata.to_dict() for metadata in metadata_list]
+        # Rows are already shaped like FileMetadata.to_dict
+        return list(map(dict, result.mappings()))
+
+async def search_metadata_count(
+    query: str = None,
+    extensions: List[str] = None,
+    is_directory: bool = None,
+    min_size: int = None,
+    max_size: int = None,
+    modified_after: datetime = None,
+    modified_before: datetime = None,
+    path_prefix: str = None,
+    max_depth: int = None,
+) -> int:
+    """
+    Count the file metadata entries search_metadata would match, ignoring pagination.
+    Takes the same filter arguments as search_metadata.
+    """
+    flags, params = _metadata_params(
+        query, extensions, is_directory, min_size, max_size,
+        modified_after, modified_before, path_prefix, max_depth
+    )
+    async with async_session() as session:
+        result = await session.execute(_metadata_statement(True, *flags), params)
+        return result.scalar_one()
 
 async def get_metadata_by_path(file_path: Union[str, pathlib.Path]) -> Optional[Dict[str, Any]]:
     """
@@ -372,14 +945,118 @@ async def get_metadata_by_path(file_path: Union[str, pathlib.Path]) -> Optional[
         file_path = pathlib.Path(file_path)
         
     async with async_session() as session:
-        query = select(FileMetadata).where(FileMetadata.path == str(file_path))
-        result = await session.execute(query)
+        result = await session.execute(METADATA_BY_PATH, {"path": str(file_path)})
         metadata = result.scalar_one_or_none()
         
         if metadata:
             return metadata.to_dict()
         return None
 
+async def get_file_hashes(paths: List[str]) -> Dict[str, Tuple[int, int, str]]:
+    """
+    Look up cached content hashes.
+    
+    Args:
+        paths: File paths to look up
+        
+    Returns:
+        Dictionary mapping each cached path to its (size_bytes, mtime_ns, hex sha256)
+    """
+    hashes = {}
+    async with async_session() as session:
+        for start in range(0, len(paths), FILE_HASH_LOOKUP_BATCH):
+            batch = paths[start:start + FILE_HASH_LOOKUP_BATCH]
+            result = await session.execute(
+                select(FileHash.path, FileHash.size_bytes, FileHash.mtime_ns, FileHash.sha256)
+                .where(FileHash.path.in_(batch))
+            )
+            for path, size_bytes, mtime_ns, sha256 in result:
+                hashes[path] = (size_bytes, mtime_ns, sha256)
+    return hashes
+
+async def store_file_hashes(hashes: Dict[str, Tuple[int, int, str]]) -> None:
+    """
+    Insert or replace cached content hashes.
+    
+    Args:
+        hashes: Dictionary mapping file paths to (size_bytes, mtime_ns, hex sha256)
+    """
+    if not hashes:
+        return
+    stmt = sqlite_insert(FileHash)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FileHash.path],
+        set_={
+            "size_bytes": stmt.excluded.size_bytes,
+            "mtime_ns": stmt.excluded.mtime_ns,
+            "sha256": stmt.excluded.sha256,
+        }
+    )
+    async with async_session() as session:
+        await session.execute(stmt, [
+            {"path": path, "size_bytes": size_bytes, "mtime_ns": mtime_ns, "sha256": sha256}
+            for path, (size_bytes, mtime_ns, sha256) in hashes.items()
+        ])
+        await session.commit()
+
+# index_directory_recursive lists directories in this pool, up to this many
+# ahead of the one being consumed, so scandir/stat calls overlap the batch writes
+INDEX_WALK_CONCURRENCY = 8
+INDEX_WALK_EXECUTOR = ThreadPoolExecutor(max_workers=INDEX_WALK_CONCURRENCY, thread_name_prefix="index")
+
+def scan_index_directory(root: str, last_indexed: datetime) -> Tuple[List[Dict[str, Any]], List[str], int]:
+    """
+    List one directory for index_directory_recursive. Runs in INDEX_WALK_EXECUTOR.
+    
+    Args:
+        root: Directory to list
+        last_indexed: Indexing time recorded for every row
+        
+    Returns:
+        Tuple of (metadata rows for its subdirectories then its files,
+        subdirectories to descend into, number of ignored entries)
+    """
+    # One scandir per directory: DirEntry.is_dir() comes from the directory
+    # listing, and each entry then needs a single stat() for its details
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does
+        return [], [], 0
+        
+    dirs = []
+    files = []
+    skipped_count = 0
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+            
+        # Skip ignored directories and files (and never descend into ignored directories)
+        if IGNORE_PATTERNS_AVAILABLE and ignore_patterns.should_ignore(entry.path):
+            logger.debug("Skipping ignored %s: %s", "directory" if is_dir else "file", entry.path)
+            skipped_count += 1
+            continue
+            
+        (dirs if is_dir else files).append(entry)
+        
+    # Directories at this level, then files. A directory's row comes only from
+    # its parent's listing (the walk root from index_file), never again when it
+    # is listed itself, so each one is stat'ed and written once
+    rows = []
+    for is_directory, group in ((True, dirs), (False, files)):
+        for entry in group:
+            try:
+                rows.append(metadata_row(entry.path, root, entry.name, is_directory, entry.stat(), last_indexed))
+            except OSError as e:
+                logger.error(f"Error indexing {'directory' if is_directory else 'file'} {entry.path}: {e}")
+                
+    # Descend into subdirectories, but not through symlinks (like os.walk)
+    subdirs = [entry.path for entry in dirs if not entry.is_symlink()]
+    return rows, subdirs, skipped_count
+
 async def index_directory_recursive(
     directory_path: Union[str, pathlib.Path],
     max_files: int = None,  # Changed from 1000 to None (no limit)
@@ -411,106 +1088,66 @@ async def index_directory_recursive(
     # Count of indexed files
     count = 0
     skipped_count = 0
+    # Rows waiting for the next bulk upsert
+    rows = []
     
     # Index the directory itself
     async with async_session() as session:
         try:
-            await index_file(directory_path, session)
+            # Committed along with the first batch
+            await _index_file_in_session(session, directory_path)
             count += 1
             
-            # Helper function to index files with depth limit
-            def get_rel_depth(path, base_path):
-                # Calculate relative path depth
-                rel_path = str(path.relative_to(base_path))
-                return rel_path.count('/') + 1 if rel_path != '.' else 0
-                
-            # Walk through contents with limits
-            for root, dirs, files in os.walk(directory_path):
-                root_path = pathlib.Path(root)
-                current_depth = get_rel_depth(root_path, directory_path)
-                
-                # Skip if we've reached max depth
-                if current_depth >= max_depth:
-                    logger.info(f"Skipping deeper traversal at depth {current_depth}: {root_path}")
-                    dirs.clear()  # Don't traverse deeper
-                    continue
-                
-                # Filter directories based on ignore patterns (modifies dirs in-place)
-                if IGNORE_PATTERNS_AVAILABLE:
-                    dirs_to_remove = []
-                    for dir_name in dirs:
-                        dir_path = root_path / dir_name
-                        if ignore_patterns.should_ignore(dir_path):
-                            dirs_to_remove.append(dir_name)
-                            skipped_count += 1
-                            logger.debug(f"Skipping ignored directory: {dir_path}")
-                    
-                    # Remove ignored directories from the dirs list to prevent recursion into them
-                    for dir_name in dirs_to_remove:
-                        dirs.remove(dir_name)
-                
-                try:
-                    # Index directories at this level
-                    for dir_name in dirs[:]:  # Copy to avoid modification during iteration
-                        try:
-                            dir_path = root_path / dir_name
-                            
-                            # Skip if we should ignore this directory
-                            if IGNORE_PATTERNS_AVAILABLE and ignore_patterns.should_ignore(dir_path):
-                                logger.debug(f"Skipping ignored directory: {dir_path}")
-                                continue
-                                
-                            await index_file(dir_path, session)
-                            count += 1
+            # Directories still to consume as (path, depth), taken depth-first in the
+            # same order os.walk would visit them. The next INDEX_WALK_CONCURRENCY of
+            # them are listed ahead in INDEX_WALK_EXECUTOR while batches are written
+            loop = asyncio.get_running_loop()
+            scans = {}
+            # One indexing time for the whole walk rather than a utcnow() per row
+            last_indexed = datetime.utcnow()
+            pending = [(str(directory_path), 0)] if max_depth > 0 else []
+            try:
+                while pending:
+                    for path, _ in pending[-INDEX_WALK_CONCURRENCY:]:
+                        if path not in scans:
+                            scans[path] = loop.run_in_executor(
+                                INDEX_WALK_EXECUTOR, scan_index_directory, path, last_indexed
+                            )
                             
-                            # Break if we've reached the file limit (if one is set)
-                            if max_files is not None and count >= max_files:
-                                logger.info(f"Reached file limit of {max_files}")
-                                return count
-                        except ValueError as e:
-                            if "Path ignored" in str(e):
-                                skipped_count += 1
-                            else:
-                                logger.error(f"Error indexing directory {dir_path}: {e}")
-                        except Exception as e:
-                            logger.error(f"Error indexing directory {dir_path}: {e}")
+                    root, current_depth = pending.pop()
+                    dir_rows, subdirs, skipped = await scans.pop(root)
+                    skipped_count += skipped
                     
-                    # Index files at this level
-                    for file_name in files:
-                        try:
-                            file_path = root_path / file_name
+                    for row in dir_rows:
+                        rows.append(row)
+                        count += 1
+                        
+                        # Break if we've reached the file limit (if one is set)
+                        if max_files is not None and count >= max_files:
+                            await upsert_metadata_rows(session, rows)
+                            logger.info(f"Reached file limit of {max_files}")
+                            return count
                             
-                            # Skip if we should ignore this file
-                            if IGNORE_PATTERNS_AVAILABLE and ignore_patterns.should_ignore(file_path):
-                                logger.debug(f"Skipping ignored file: {file_path}")
-                                skipped_count += 1
-                                continue
-                                
-                            await index_file(file_path, session)
-                            count += 1
-                            
-                            # Commit periodically
-                            if count % 50 == 0:
-                                await session.commit()
-                                logger.info(f"Indexed {count} files so far, skipped {skipped_count} ignored files")
-                                
-                            # Break if we've reached the file limit (if one is set)
-                            if max_files is not None and count >= max_files:
-                                logger.info(f"Reached file limit of {max_files}")
-                                return count
-                        except ValueError as e:
-                            if "Path ignored" in str(e):
-                                skipped_count += 1
-                            else:
-                                logger.error(f"Error indexing file {file_path}: {e}")
-                        except Exception as e:
-                            logger.error(f"Error indexing file {file_path}: {e}")
-                except Exception as e:
-                    logger.error(f"Error processing directory content in {root_path}: {e}")
-                    continue
+                    # Skip if we've reached max depth
+                    next_depth = current_depth + 1
+                    if next_depth >= max_depth:
+                        if subdirs:
+                            logger.info(f"Skipping deeper traversal at depth {next_depth}: {len(subdirs)} directories under {root}")
+                    else:
+                        pending.extend((path, next_depth) for path in reversed(subdirs))
+                        
+                    # Write a batch once enough rows have accumulated
+                    if len(rows) >= INDEX_BATCH_SIZE:
+                        await upsert_metadata_rows(session, rows)
+                        rows.clear()
+                        logger.info(f"Indexed {count} files so far, skipped {skipped_count} ignored files")
+            finally:
+                # Listings started ahead that won't be consumed
+                for scan in scans.values():
+                    scan.cancel()
                     
-            # Final commit
-            await session.commit()
+            # Write the remaining rows
+            await upsert_metadata_rows(session, rows)
             logger.info(f"Successfully indexed {count} files in {directory_path}, skipped {skipped_count} ignored files")
             
         except Exception as e:
@@ -530,4 +1167,7 @@ async def initialize_database():
 async def close_database():
     """Close database connections on shutdown."""
     await engine.dispose()
+    READ_ONLY_EXECUTOR.shutdown(wait=True)
+    INDEX_WALK_EXECUTOR.shutdown(wait=True)
+    close_read_only_connections()
     logger.info("Database connections closed.")
\ No newline at end of file
@@ -2,41 +2,59 @@
 """
 Database Analysis Tool
 
-This script provides examples of how to use the database query API
-for analyzing the metadata database.
+This script runs example analyses of the metadata database, reading the
+SQLite file directly (read-only) rather than going through the
+database query API.
 """
-import requests
+import sqlite3
 import json
 import time
-import sys
 import os
 from datetime import datetime, timedelta
 
-# Add the project root to the path so modules can be imported
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from src.utils.config import API_URL
+# The metadata database sits next to this script (see db.DB_PATH)
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metadata.db")
+
+# Labels and exclusive upper bounds (bytes) of the file size distribution buckets
+SIZE_BUCKETS = [
+    ("< 1 KB", 1024),
+    ("1-10 KB", 10240),
+    ("10-100 KB", 102400),
+    ("100 KB-1 MB", 1048576),
+    ("1-10 MB", 10485760),
+    ("10-100 MB", 104857600),
+    ("> 100 MB", None),
+]
+
+# Read-only connection shared by every query, opened on first use
+_connection = None
+
+def get_connection():
+    """Open (once) a read-only connection to the metadata database"""
+    global _connection
+    if _connection is None:
+        # mode=ro rather than immutable=1: the server may be writing through
+        # the WAL, which an immutable connection would not see
+        _connection = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        _connection.execute("PRAGMA query_only = 1")
+        _connection.execute("PRAGMA mmap_size = 268435456")  # 256 MB
+    return _connection
 
 def run_query(query, params=None, description=None):
-    """Run a SQL query via the API"""
+    """Run a SQL query directly against the database"""
     if description:
         print(f"\n=== {description} ===")
         print(f"Query: {query}")
     
     try:
-        response = requests.post(
-            f"{API_URL}/database_query",
-            json={
-                "query": query,
-                "params": params,
-                "limit": 1000
-            }
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error {response.status_code}: {response.text}")
-            return None
+        start_time = time.perf_counter()
+        cursor = get_connection().execute(query, params or ())
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return {
+            "rows": rows,
+            "execution_time_ms": round((time.perf_counter() - start_time) * 1000, 2)
+        }
     except Exception as e:
         print(f"Error executing query: {e}")
         return None
@@ -115,37 +133,25 @@ def analyze_database():
     )
     print_results(extensions)
     
-    # File sizes
+    # File sizes, counted one range of the (is_directory, size_bytes) index
+    # per bucket rather than classifying every file row with a CASE
+    bounds = [None] + [upper for _, upper in SIZE_BUCKETS]
+    bucket_queries = ["SELECT 'Unknown' AS size_range, COUNT(*) AS count FROM file_metadata WHERE is_directory = 0 AND size_bytes IS NULL"]
+    for (label, upper), lower in zip(SIZE_BUCKETS, bounds):
+        condition = " AND ".join(
+            ([f"size_bytes >= {lower}"] if lower is not None else []) +
+            ([f"size_bytes < {upper}"] if upper is not None else [])
+        )
+        bucket_queries.append(
+            f"SELECT '{label}', COUNT(*) FROM file_metadata WHERE is_directory = 0 AND {condition}"
+        )
     sizes = run_query(
-        """
-        SELECT 
-            CASE
-                WHEN size_bytes IS NULL THEN 'Unknown'
-                WHEN size_bytes < 1024 THEN '< 1 KB'
-                WHEN size_bytes < 10240 THEN '1-10 KB'
-                WHEN size_bytes < 102400 THEN '10-100 KB'
-                WHEN size_bytes < 1048576 THEN '100 KB-1 MB'
-                WHEN size_bytes < 10485760 THEN '1-10 MB'
-                WHEN size_bytes < 104857600 THEN '10-100 MB'
-                ELSE '> 100 MB'
-            END as size_range,
-            COUNT(*) as count
-        FROM file_metadata
-        WHERE is_directory = 0
-        GROUP BY size_range
-        ORDER BY CASE
-            WHEN size_range = 'Unknown' THEN 0
-            WHEN size_range = '< 1 KB' THEN 1
-            WHEN size_range = '1-10 KB' THEN 2
-            WHEN size_range = '10-100 KB' THEN 3
-            WHEN size_range = '100 KB-1 MB' THEN 4
-            WHEN size_range = '1-10 MB' THEN 5
-            WHEN size_range = '10-100 MB' THEN 6
-            ELSE 7
-        END
-        """,
+        "\nUNION ALL\n".join(bucket_queries),
         description="File Size Distribution"
     )
+    if sizes:
+        # Like GROUP BY, only list the buckets that have files
+        sizes["rows"] = [row for row in sizes["rows"] if row["count"]]
     print_results(sizes)
     
     # Most recent files
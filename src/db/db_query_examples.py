@@ -13,6 +13,9 @@ from pprint import pprint
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def format_json(data):
     """Format JSON data for pretty printing"""
     return json.dumps(data, indent=2)
@@ -21,7 +24,7 @@ def index_directory(path):
     """Index a directory to populate the database"""
     print(f"Indexing directory: {path}")
     
-    response = requests.post(
+    response = SESSION.post(
         f"{API_URL}/index_directory",
         json={"path": path}
     )
@@ -39,7 +42,7 @@ def run_query(query, params=None, limit=1000):
     """Run a SQL query via the API"""
     print(f"\n--- Running query: {query} ---")
     
-    response = requests.post(
+    response = SESSION.post(
         f"{API_URL}/database_query",
         json={
             "query": query,
@@ -73,7 +76,7 @@ def demo_queries():
     """Run a series of example queries to demonstrate capabilities"""
     # Get database status
     print("\nFetching database status...")
-    response = requests.get(f"{API_URL}/metadata_status")
+    response = SESSION.get(f"{API_URL}/metadata_status")
     if response.status_code == 200:
         data = response.json()
         print(f"Database status: {data.get('status')}")
@@ -13,12 +13,15 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def run_query(query, description=""):
     """Run a SQL query via the API"""
     print(f"\n--- {description} ---")
     print(f"Query: {query}")
     
-    response = requests.post(
+    response = SESSION.post(
         f"{API_URL}/database_query",
         json={"query": query}
     )
@@ -47,7 +50,7 @@ def run_query(query, description=""):
 def main():
     # First, populate the database
     print("First, checking the database status...")
-    response = requests.get(f"{API_URL}/metadata_status")
+    response = SESSION.get(f"{API_URL}/metadata_status")
     if response.status_code == 200:
         data = response.json()
         print(f"Database status: {data.get('status')}")
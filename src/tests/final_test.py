@@ -19,15 +19,18 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def test_endpoint(method, endpoint, data=None, description=""):
     """Test an API endpoint"""
     print(f"\n=== Testing {method.upper()} {endpoint} - {description} ===")
     
     try:
         if method.lower() == "get":
-            response = requests.get(f"{API_URL}{endpoint}")
+            response = SESSION.get(f"{API_URL}{endpoint}")
         elif method.lower() == "post":
-            response = requests.post(f"{API_URL}{endpoint}", json=data)
+            response = SESSION.post(f"{API_URL}{endpoint}", json=data)
         else:
             print(f"Unsupported method: {method}")
             return None
@@ -84,6 +87,13 @@ def main():
                   data={"query": "SELECT path, size_bytes FROM file_metadata WHERE is_directory = 0 ORDER BY size_bytes DESC LIMIT 5"}, 
                   description="Find largest files")
                   
+    # BLOB values (e.g. from SQL blob literals) should come back as hex strings
+    result = test_endpoint("post", "/database_query", 
+                  data={"query": "SELECT X'00ff' AS blob_value"}, 
+                  description="Query a BLOB value")
+    if not result or result["rows"][0]["blob_value"] != "00ff":
+        print("ERROR: BLOB value was not returned as a hex string")
+                  
     # Test 5: Test original API functionality (list_directory)
     print("\n=== Testing original API functionality ===")
     test_endpoint("post", "/list_directory", data={"path": "/app/testdir"}, 
@@ -11,13 +11,16 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def run_query(query, description=""):
     """Run a SQL query via the API"""
     print(f"\n--- {description} ---")
     print(f"Query: {query}")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_URL}/database_query",
             json={"query": query}
         )
@@ -51,7 +54,7 @@ def main():
     # First, index our test directory
     print("Indexing test directory...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_URL}/index_directory",
             json={"path": "/app/testdir"}
         )
@@ -12,6 +12,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def main():
     """Test watching the CodeGen directory"""
     codegen_path = "/mnt/c/Sandboxes/CodeGen"
@@ -25,7 +28,7 @@ def main():
     print(f"Making request to {url} with data: {data}\n")
     
     try:
-        response = requests.post(url, json=data)
+        response = SESSION.post(url, json=data)
         print(f"Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -8,6 +8,9 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def test_ignore_extensions():
     """Test if specific file extensions are being ignored"""
     print("Testing if ignore patterns for file extensions are working correctly...")
@@ -21,7 +24,7 @@ def test_ignore_extensions():
         ext_pattern = ext.replace("*", "")  # Remove wildcard for search
         print(f"\nSearching for {ext_pattern} files (should be ignored)...")
         
-        search_response = requests.post(
+        search_response = SESSION.post(
             f"{API_URL}/search_files",
             json={
                 "path": "/mnt/c/Sandboxes/CodeGen",
@@ -8,12 +8,15 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 from src.utils.config import API_URL
 
+# Shared by every call so requests reuse one keep-alive connection to the API
+SESSION = requests.Session()
+
 def test_indexing(path):
     """Test indexing a directory and print progress"""
     print(f"Testing indexing on path: {path}")
     
     # First check if ignore patterns are loaded
-    ignore_response = requests.get(f"{API_URL}/ignore_patterns")
+    ignore_response = SESSION.get(f"{API_URL}/ignore_patterns")
     ignore_data = ignore_response.json()
     print(f"Ignore patterns status: {ignore_data.get('status')}")
     print(f"Number of ignore patterns loaded: {ignore_data.get('pattern_count', 0)}")
@@ -22,7 +25,7 @@ def test_indexing(path):
     start_time = time.time()
     print(f"Starting indexing operation at {time.strftime('%H:%M:%S')}")
     
-    index_response = requests.post(
+    index_response = SESSION.post(
         f"{API_URL}/index_directory",
         json={"path": path}
     )
@@ -43,7 +46,7 @@ def test_indexing(path):
     print(f"Message: {result.get('message', '')}")
     
     # Check metadata status
-    metadata_response = requests.get(f"{API_URL}/metadata_status")
+    metadata_response = SESSION.get(f"{API_URL}/metadata_status")
     metadata_data = metadata_response.json()
     print(f"\nMetadata status: {metadata_data.get('status')}")
     print(f"Total indexed files in database: {metadata_data.get('indexed_files', 0)}")
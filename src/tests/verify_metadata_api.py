@@ -87,6 +87,13 @@ def main():
                   }, 
                   description="Query the metadata database")
     
+    # Test database query returning a BLOB value (reported as a hex string)
+    result = test_endpoint("post", "/metadata/database_query", 
+                  data={"query": "SELECT X'00ff' AS blob_value"}, 
+                  description="Query a BLOB value")
+    if not result or result["rows"][0]["blob_value"] != "00ff":
+        print("ERROR: BLOB value was not returned as a hex string")
+    
     # Test reindex
     test_endpoint("post", "/metadata/reindex", 
                   data={"path": "/app/testdir"}, 
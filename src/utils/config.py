@@ -27,7 +27,24 @@ DB_PATH = os.environ.get("DB_PATH", None)  # If None, default path will be used
 CACHE_SIZE_MB = int(os.environ.get("CACHE_SIZE_MB", "100"))  # 100MB default
 
 # Worker thread configuration
-THREAD_POOL_SIZE = int(os.environ.get("THREAD_POOL_SIZE", "10"))  # 10 threads default
+# Default follows ThreadPoolExecutor's own sizing for IO-bound work: min(32, cpu_count + 4)
+DEFAULT_THREAD_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+THREAD_POOL_SIZE = int(os.environ.get("THREAD_POOL_SIZE", DEFAULT_THREAD_POOL_SIZE))
+
+# Content search runs in its own pool so large scans don't starve other endpoints;
+# file reads block on disk rather than CPU, so it is sized well above the core count
+DEFAULT_SEARCH_THREAD_POOL_SIZE = (os.cpu_count() or 1) * 4
+SEARCH_THREAD_POOL_SIZE = int(os.environ.get("SEARCH_THREAD_POOL_SIZE", DEFAULT_SEARCH_THREAD_POOL_SIZE))
+
+# Filesystem walks for search_files allowed to run at once; each holds a worker
+# thread for its whole duration, so further requests wait their turn instead
+MAX_CONCURRENT_SEARCHES = int(os.environ.get("MAX_CONCURRENT_SEARCHES", "8"))
+
+# Replay identical list_directory and search_files requests from a short-lived
+# response cache. Off by default: entries are only checked against the base
+# directory's mtime, so changes made outside the API (file edits, anything below
+# the top level) can go unseen until the entry expires
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
 
 # Allowed directories
 def get_allowed_directories():
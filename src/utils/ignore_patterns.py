@@ -5,7 +5,7 @@ Provides functionality similar to .gitignore processing.
 import pathlib
 import fnmatch
 import re
-from typing import List, Set, Optional, Union
+from typing import Callable, List, Set, Optional, Union
 
 # Default path to ignore file
 import os
@@ -26,6 +26,9 @@ class IgnorePatternMatcher:
         """
         self.patterns: List[str] = []
         self.regex_patterns: List[re.Pattern] = []
+        # All patterns (and all negation patterns) combined into one regex each
+        self._ignore_match = None
+        self._negation_match = None
         
         # Common directory patterns that should always be ignored
         self.common_ignored_dirs = [
@@ -60,6 +63,7 @@ class IgnorePatternMatcher:
             path = pathlib.Path(self.ignore_file)
             if not path.exists():
                 print(f"Warning: Ignore file not found at {self.ignore_file}")
+                self._compile_matchers()
                 return
                 
             with open(path, 'r') as f:
@@ -119,6 +123,16 @@ class IgnorePatternMatcher:
             # Initialize with empty patterns
             self.patterns = []
             self.regex_patterns = []
+        self._compile_matchers()
+    
+    def _compile_matchers(self) -> None:
+        """
+        Combine the loaded patterns into a single regex alternation, and the
+        negation patterns into another, so a path is tested against all of
+        them in one match call instead of one fnmatch call per pattern.
+        """
+        self._ignore_match = _compile_union(p for p in self.patterns if not p.startswith('!'))
+        self._negation_match = _compile_union(p[1:] for p in self.patterns if p.startswith('!'))
     
     def should_ignore(self, path: Union[str, pathlib.Path]) -> bool:
         """
@@ -131,11 +145,7 @@ class IgnorePatternMatcher:
         Returns:
             True if the path should be ignored, False otherwise
         """
-        if isinstance(path, pathlib.Path):
-            path_str = str(path)
-        else:
-            path_str = path
-            path = pathlib.Path(path_str)
+        path_str = str(path)
             
         # Quick check for common ignored directories
         path_parts = path_str.split('/')
@@ -144,44 +154,40 @@ class IgnorePatternMatcher:
                 return True
                 
         # Handle negation patterns first (patterns starting with !)
-        for pattern in self.patterns:
-            if pattern.startswith('!'):
-                # Negation means explicitly don't ignore
-                negate_pattern = pattern[1:]
-                if fnmatch.fnmatch(path_str, negate_pattern):
-                    return False
+        # Negation means explicitly don't ignore
+        if self._negation_match is not None and self._negation_match(path_str):
+            return False
+        
+        if self._ignore_match is None:
+            return False
         
         # Check direct pattern matches
-        for pattern in self.patterns:
-            if pattern.startswith('!'):
-                continue  # Skip negation patterns, already handled
-                
-            # Standard matching
-            if fnmatch.fnmatch(path_str, pattern):
-                return True
+        if self._ignore_match(path_str):
+            return True
         
-        # Special case for node_modules and other common directories
-        # More aggressive check that looks for these anywhere in the path
-        for common_dir in self.common_ignored_dirs:
-            if f"/{common_dir}/" in path_str or path_str.endswith(f"/{common_dir}"):
+        # Check path components (parent directories), from the root down
+        partial_path = ""
+        for part in pathlib.PurePath(path).parts:
+            partial_path = os.path.join(partial_path, part)
+            if self._ignore_match(partial_path):
                 return True
-        
-        # Check path components (parent directories)
-        path_parts = list(path.parts)
-        for i in range(1, len(path_parts) + 1):
-            # Check each parent directory
-            partial_path = str(pathlib.Path(*path_parts[:i]))
-            
-            for pattern in self.patterns:
-                if pattern.startswith('!'):
-                    continue  # Skip negation patterns, already handled
-                    
-                if fnmatch.fnmatch(partial_path, pattern):
-                    return True
-                    
+                
         return False
 
 
+def _compile_union(patterns) -> Optional[Callable[[str], Optional[re.Match]]]:
+    """
+    Compile glob patterns into one regex matching any of them, with the same
+    semantics as fnmatch.fnmatch. Returns its match method, or None if there
+    are no patterns.
+    """
+    # fnmatch.translate numbers its groups globally, so translations can be joined
+    translated = [fnmatch.translate(pattern) for pattern in patterns]
+    if not translated:
+        return None
+    return re.compile("|".join(translated)).match
+
+
 # Create a singleton instance for easy access
 _default_matcher = None
 
@@ -50,6 +50,10 @@ async def reset_database(force=False):
         # Delete the existing database file
         try:
             os.remove(db_path)
+            # WAL mode keeps the log and shared-memory index next to the database
+            for sidecar in (f"{db_path}-wal", f"{db_path}-shm"):
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
             logger.info(f"Database at {db_path} has been deleted.")
         except Exception as e:
             logger.error(f"Error deleting database: {e}")
@@ -8,7 +8,7 @@ import os
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Set, List, Optional, Union, Any, Deque
+from typing import Callable, Dict, Set, List, Optional, Union, Any, Deque
 from collections import deque
 from src.db import db  # Database operations module
 
@@ -28,6 +28,10 @@ global_lock = asyncio.Lock()  # Global lock for state modifications
 # Flag to indicate watcher functionality is available
 WATCHER_AVAILABLE = True
 
+# Called with a directory's path after a scan has brought its index up to date,
+# e.g. so the API can drop responses cached from before changes made outside it
+change_listeners: List[Callable[[str], None]] = []
+
 # Change queue to handle throttling
 path_change_queue: Deque[str] = deque(maxlen=10000)  # Limits the number of queued changes
 
@@ -195,7 +199,7 @@ def notify_change(path: Union[str, pathlib.Path]) -> None:
                     modified_paths.add(parent_str)
                     # Don't queue parents for immediate processing to reduce duplicate work
                     
-        logger.debug(f"Change notification received for: {path}")
+        logger.debug("Change notification received for: %s", path)
         
         # Ensure watcher is running to process these changes
         # Since start_watcher_if_needed is async and we're in a sync context,
@@ -245,7 +249,7 @@ async def _scan_directories() -> None:
                 for metadata in db_files:
                     file_path = pathlib.Path(metadata.path)
                     if not file_path.exists():
-                        logger.debug(f"File no longer exists, removing from index: {metadata.path}")
+                        logger.debug("File no longer exists, removing from index: %s", metadata.path)
                         await db.delete_metadata(file_path, session)
                 
                 await session.commit()
@@ -253,6 +257,8 @@ async def _scan_directories() -> None:
             # Scan for new and modified files
             count = await db.index_directory_recursive(directory)
             logger.info(f"Scan complete. Processed {count} files in {dir_str}")
+            for listener in change_listeners:
+                listener(dir_str)
             
             # Update scan time
             last_scan_times[dir_str] = now